@@ -13,7 +13,22 @@ config:ConfigDict = {
     "python_cmd" : 'python',
     "main" : "main.py",
     "logging_level" : "WARNING",
-    "font" : None
+    "font" : None,
+    "action_dispatch" : "concurrent",#'sequential' awaits every action of an interaction in turn
+    "max_concurrent_actions" : 16,
+    "latency_path" : "data/latency.json",#where players' response latencies are stored between runs
+    "latency_max_samples" : 50,#most recent latencies kept per player and game type
+    "latency_min_samples" : 10,#latencies needed before timeouts adapt to them
+    "adaptive_timeouts" : False,#shorten timeouts and warnings to how long players have actually taken
+    "adaptive_timeout_percentile" : 95,
+    "adaptive_timeout_factor" : 3.0,
+    "adaptive_timeout_floor" : 120,#2 min
+    "adaptive_timeout_ceiling" : 86400,#24 h
+    "edit_debounce" : 0.5,#least seconds between edits to a message while they come faster than they are made; those in between are collapsed into one
+    "selection_backend" : "reactions",#'components' to have players choose options with buttons rather than by reacting
+    "thread_setup_concurrency" : 4,#thread membership changes made at once
+    "thread_pool_size" : 32,#unused threads kept for reuse between games; any more are deleted
+    "prewarm_threads" : True#make a thread for each player ahead of time while no game is running
 }
 
 merge_local('config',config) #type: ignore
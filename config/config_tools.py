@@ -37,6 +37,21 @@ class ConfigDict(TypedDict):
     main:str
     logging_level:str|int
     font:None|str
+    action_dispatch:Literal['sequential','concurrent']
+    max_concurrent_actions:int
+    latency_path:str
+    latency_max_samples:int
+    latency_min_samples:int
+    adaptive_timeouts:bool
+    adaptive_timeout_percentile:float
+    adaptive_timeout_factor:float
+    adaptive_timeout_floor:int
+    adaptive_timeout_ceiling:int
+    edit_debounce:float
+    selection_backend:Literal['reactions','components']
+    thread_setup_concurrency:int
+    thread_pool_size:int
+    prewarm_threads:bool
 #region game specific configs
 class AlteredImageGuessConfig(TypedDict):
     num_rounds:int
@@ -1,27 +1,55 @@
+import asyncio
+import bisect
+import dataclasses
+from collections import OrderedDict
+import hashlib
+import io
+import os
+from functools import partial
 from random import shuffle
-from typing import Iterable, Optional, override, Callable, Awaitable
-from time import sleep
+from typing import Any, Iterable, Optional, override, Callable, Awaitable
 
 import discord
 
+from config.config import config
 from game import get_logger
 from game.components.game_interface import (
     Channel_Limited_Game_Interface,
     Channel_Limited_Interface_Sender,
 )
 from game.components.interaction import Interaction
-from game.components.message import Add_Bullet_Points_To_Content_Alias_Message, Message
+from game.components.message import (
+    Add_Bullet_Points_To_Content_Alias_Message,
+    Attachment,
+    Attachment_Buffer,
+    Bullet_Point,
+    Message,
+    Message_Render,
+)
 from utils.grammar import wordify_iterable
 from utils.types import ChannelId, MessageId, PlayerId
 
 
 type AsyncCallback = Callable[[],Awaitable[None]]
+type SendJob = Callable[[],Awaitable[Any]]
 DiscordChannel = discord.TextChannel|discord.Thread
 
 logger = get_logger(__name__)
 
 MESSAGE_MAX_LENGTH = 1800#actually 2000, but I leave extra for split indicators
-SLEEP429 = 10
+SLEEP429 = 10#how long a route waits after a failed request when discord does not say
+MAX_SEND_ATTEMPTS = 5
+CHANNEL_CACHE_SIZE = 256
+MAX_COMPONENT_OPTIONS = 25#the most buttons discord allows on one message
+BUTTON_LABEL_MAX_LENGTH = 80
+OPTION_CUSTOM_ID_PREFIX = "option:"
+MESSAGE_CACHE_SIZE = 1024
+IDLE_THREAD_NAME = "unused"#what pooled threads are renamed to between games
+THREAD_AUTO_ARCHIVE = 10080#waits 7 days until it hides the thread
+
+PROMPT_PRIORITY = 0
+STATUS_PRIORITY = 1
+REACTION_PRIORITY = 2
 
 def discord_message_populate_interaction(
         payload:discord.Message, interaction:Interaction):
@@ -49,73 +77,422 @@ async def discord_message_emoji_order(
     return emoji
 
 
+def retry_after(exception:discord.HTTPException|discord.RateLimited) -> float:
+    """returns how long discord asked for a failed request's route to wait before retrying"""
+    if isinstance(exception,discord.RateLimited):
+        return exception.retry_after
+    header = getattr(exception.response,'headers',{}).get('Retry-After')
+    if header is not None:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+    return SLEEP429
+def is_retryable(exception:discord.HTTPException|discord.RateLimited) -> bool:
+    """returns whether a failed request is worth retrying, being rate limited or a server error"""
+    return isinstance(exception,discord.RateLimited) or exception.status == 429 or exception.status >= 500
+
+class Route_Bucket(object):
+    """the rate limit state of one discord route, kept so that its requests wait out discord's retry_after without holding up other routes"""
+    __slots__ = ('blocked_until',)
+    def __init__(self):
+        self.blocked_until:float = 0
+    def is_blocked(self) -> bool:
+        """returns whether the route is still waiting out a rate limit"""
+        return self.blocked_until > asyncio.get_running_loop().time()
+    def block(self,seconds:float):
+        """keeps the route from being used for seconds"""
+        self.blocked_until = max(self.blocked_until,asyncio.get_running_loop().time() + seconds)
+
+type SendEntry = tuple[int,int,str,SendJob,asyncio.Future[Any],int]
+"priority, submission order, route, job, the job's future, and which attempt at the job is next"
+
+class Send_Queue(object):
+    """
+    an outbound queue for discord requests;
+    each channel's requests are made one at a time by its own worker, lowest priority number first and otherwise in the order submitted,
+    and each route, a kind of request on a channel, pauses for as long as discord's rate limits ask, 
+    while the worker moves on to requests on routes which are not paused
+    """
+    def __init__(self):
+        self._pending:dict[ChannelId,list[SendEntry]] = {}
+        "each channel's waiting requests, kept sorted"
+        self._wakeups:dict[ChannelId,asyncio.Event] = {}
+        "set when a request is submitted, so a worker waiting out rate limits can check whether it can make it"
+        self._workers:dict[ChannelId,asyncio.Task[None]] = {}
+        self._buckets:dict[tuple[str,ChannelId],Route_Bucket] = {}
+        self._counter:int = 0
+    def submit(self,channel_id:ChannelId,route:str,priority:int,job:SendJob) -> asyncio.Future[Any]:
+        """
+        queues job to be called on channel_id's worker, returning a future of its result
+
+        route: the kind of request job makes, such as 'message' or 'reaction', which shares its rate limit with others of the kind on the channel
+
+        priority: PROMPT_PRIORITY, STATUS_PRIORITY or REACTION_PRIORITY; lower numbers are made first
+        """
+        future:asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(channel_id,[])
+        bisect.insort(pending,(priority,self._counter,route,job,future,1))
+        self._counter += 1
+        wakeup = self._wakeups.setdefault(channel_id,asyncio.Event())
+        wakeup.set()
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = asyncio.create_task(self._work(channel_id,pending,wakeup))
+        return future
+    def _bucket(self,route:str,channel_id:ChannelId) -> Route_Bucket:
+        bucket = self._buckets.get((route,channel_id))
+        if bucket is None:
+            bucket = Route_Bucket()
+            self._buckets[(route,channel_id)] = bucket
+        return bucket
+    async def _work(self,channel_id:ChannelId,pending:list[SendEntry],wakeup:asyncio.Event):
+        #ends once nothing is pending; submit starts a new worker for the channel when needed
+        while True:
+            pending[:] = list(entry for entry in pending if not entry[4].done())#dropping those cancelled by the caller while waiting
+            if not pending:
+                return
+            entry = next((entry for entry in pending if not self._bucket(entry[2],channel_id).is_blocked()),None)
+            if entry is None:
+                #every pending route is rate limited, so wait for the first to free up or for something new
+                delay = min(self._bucket(entry[2],channel_id).blocked_until for entry in pending) - asyncio.get_running_loop().time()
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(),delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            pending.remove(entry)
+            priority,counter,route,job,future,attempt = entry
+            try:
+                result = await job()
+            except (discord.HTTPException,discord.RateLimited) as e:
+                if attempt < MAX_SEND_ATTEMPTS and is_retryable(e):
+                    logger.warning(f"discord request failed on attempt {attempt} with {e!r}, retrying")
+                    self._bucket(route,channel_id).block(retry_after(e))
+                    bisect.insort(pending,(priority,counter,route,job,future,attempt+1))
+                elif not future.done():
+                    future.set_exception(e)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+@dataclasses.dataclass(frozen=True,slots=True)
+class Sent_Fingerprint(object):
+    """what was last sent as a discord message, compared against to skip edits which would change nothing"""
+    content_hash:int
+    attachment_hashes:tuple[str,...]
+    bullet_points:tuple[tuple[str,Optional[str]],...]
+
+_file_hashes:dict[tuple[str,int,int],str] = {}
+"content hashes of files, keyed by path, modification time and size so that unchanged files are not read again"
+def file_hash(attachment:Attachment) -> str:
+    """returns a hash of the attachment's content"""
+    if isinstance(attachment,Attachment_Buffer):
+        return attachment.digest
+    path = attachment
+    stat = os.stat(path)
+    key = (path,stat.st_mtime_ns,stat.st_size)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        with open(path,'rb') as file:
+            digest = hashlib.sha256(file.read()).hexdigest()
+        _file_hashes[key] = digest
+    return digest
+def file_size(attachment:Attachment) -> int:
+    """returns how many bytes the attachment's content is"""
+    if isinstance(attachment,Attachment_Buffer):
+        return len(attachment.data)
+    return os.path.getsize(attachment)
+def make_file(attachment:Attachment) -> discord.File:
+    """returns a discord.File of the attachment, reading in memory files without touching the disk"""
+    if isinstance(attachment,Attachment_Buffer):
+        return discord.File(io.BytesIO(attachment.data),filename=attachment.filename)
+    return discord.File(attachment)
+def fingerprint(render:Message_Render) -> Sent_Fingerprint:
+    """returns the fingerprint of what sending render would display"""
+    return Sent_Fingerprint(
+        hash(render.content),
+        tuple(file_hash(path) for path in render.attach_paths or []),
+        tuple((bp.text,bp.emoji) for bp in render.bullet_points or []))
+
+class Bounded_Cache[K,V]:
+    """a mapping which keeps only its maxsize most recently used entries"""
+    def __init__(self,maxsize:int):
+        self.maxsize = maxsize
+        self._entries:OrderedDict[K,V] = OrderedDict()
+    def __len__(self) -> int:
+        return len(self._entries)
+    def get(self,key:K) -> Optional[V]:
+        """returns the value stored for key, if there is one, marking it as recently used"""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+    def put(self,key:K,value:V):
+        """stores value for key, dropping the least recently used entry if there are too many"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    def clear(self):
+        self._entries.clear()
+
+class Attachment_Store(object):
+    """
+    remembers, by content hash, the attachments discord already holds for each message,
+    so that edits upload only the files whose bytes are not already attached, and counts the bytes this saves
+    """
+    def __init__(self):
+        self.attachments:Bounded_Cache[MessageId,dict[str,discord.Attachment]] = Bounded_Cache(MESSAGE_CACHE_SIZE)
+        self.bytes_uploaded:int = 0
+        self.bytes_saved:int = 0
+    def prepare(self,message_id:Optional[MessageId],paths:list[Attachment]) -> list[discord.File|discord.Attachment]:
+        """returns what to give discord for paths, reusing the attachments already on message_id wherever the bytes are the same"""
+        existing = self._existing(message_id)
+        to_return:list[discord.File|discord.Attachment] = []
+        for path in paths:
+            attachment = existing.get(file_hash(path))
+            to_return.append(make_file(path) if attachment is None else attachment)
+        return to_return
+    def count(self,message_id:Optional[MessageId],paths:list[Attachment]):
+        """
+        counts the bytes uploaded and saved by a successful send of what prepare gave for paths;
+        counted apart from prepare, which is called again for each attempt at a request, and before remember replaces what message_id holds
+        """
+        existing = self._existing(message_id)
+        for path in paths:
+            if file_hash(path) in existing:
+                self.bytes_saved += file_size(path)
+            else:
+                self.bytes_uploaded += file_size(path)
+    def _existing(self,message_id:Optional[MessageId]) -> dict[str,discord.Attachment]:
+        return {} if message_id is None else (self.attachments.get(message_id) or {})
+    def skip(self,paths:list[Attachment]):
+        """counts paths as saved, for a send that left the attachments already on a message in place"""
+        self.bytes_saved += sum(file_size(path) for path in paths)
+    def remember(self,discord_message:discord.Message,paths:list[Attachment]):
+        """records the attachments discord now holds for discord_message as those of paths"""
+        #discord keeps attachments in the order they were given
+        if len(discord_message.attachments) == len(paths):
+            self.attachments.put(discord_message.id,dict(zip((file_hash(path) for path in paths),discord_message.attachments)))#type: ignore
+    def report(self) -> str:
+        """returns a summary of the bytes uploaded and the bytes reuse saved"""
+        total = self.bytes_uploaded + self.bytes_saved
+        portion = self.bytes_saved/total if total else 0
+        return f"uploaded {self.bytes_uploaded} attachment bytes, saved {self.bytes_saved} ({portion:.0%}) by reusing attachments"
+    def clear(self):
+        self.attachments.clear()
+
+def option_view(bullet_points:list[Bullet_Point]) -> discord.ui.View:
+    """
+    returns a view with a button for each bullet point, whose custom_id gives its index;
+    the view is stopped, so that discord.py sends its buttons without storing it, as presses are handled by on_interaction
+    """
+    view = discord.ui.View(timeout=None)
+    for i,bp in enumerate(bullet_points):
+        label:Optional[str] = None if bp.text is None else bp.text[:BUTTON_LABEL_MAX_LENGTH]
+        if label is None and bp.emoji is None:
+            label = str(i+1)
+        view.add_item(discord.ui.Button(
+            style=discord.ButtonStyle.secondary,
+            label=label,
+            emoji=bp.emoji,
+            custom_id=f"{OPTION_CUSTOM_ID_PREFIX}{i}"))
+    view.stop()
+    return view
+def uses_components(render:Message_Render) -> bool:
+    """returns whether render's bullet points are to be shown as buttons rather than reactions"""
+    return (
+        config['selection_backend'] == 'components' and
+        bool(render.bullet_points) and
+        len(render.bullet_points) <= MAX_COMPONENT_OPTIONS)#type: ignore
+
+def log_send_failure(future:asyncio.Future[Any]):
+    """logs the failure of a queued request that nothing awaits"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"queued discord request failed with {future.exception()!r}")
+
 class Discord_Sender(Channel_Limited_Interface_Sender):
     def __init__(self,gi:'Discord_Game_Interface'):
         Channel_Limited_Interface_Sender.__init__(self,gi)
         self.client = gi.client
         self.default_channel = gi.channel_id
+        self.queue = Send_Queue()
+        "every request is made through the queue, so that rate limits never stall the event loop"
+        self.fingerprints:dict[MessageId,Sent_Fingerprint] = {}
+        "what was last sent as each discord message"
+        self.reactions:dict[MessageId,set[str]] = {}
+        "the emoji the bot has reacted to each discord message with, or is about to"
+        self.component_messages:dict[MessageId,ChannelId] = {}
+        "the channel of each discord message sent with buttons which are yet to be taken down"
+        self.channels:Bounded_Cache[ChannelId,DiscordChannel] = Bounded_Cache(CHANNEL_CACHE_SIZE)
+        self.messages:Bounded_Cache[MessageId,discord.Message] = Bounded_Cache(MESSAGE_CACHE_SIZE)
+        "the discord.Message last returned for each message the bot has sent or edited"
+        self.attachment_store = Attachment_Store()
+    def forget(self):
+        """forgets what was sent as every message, so that the next send of each is made in full, along with every cached discord object"""
+        self.fingerprints.clear()
+        self.reactions.clear()
+        self.component_messages.clear()
+        self.channels.clear()
+        self.messages.clear()
+        logger.info(f"sender forgetting sent messages, having {self.attachment_store.report()}")
+        self.attachment_store.clear()
+    async def get_channel(self,channel_id:ChannelId) -> DiscordChannel:
+        """returns the channel, only fetching it from discord if neither this sender nor the client has it cached"""
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            assert isinstance(channel_id,int)
+            channel = self.client.get_channel(channel_id)#type: ignore
+            if channel is None:
+                await self.client.wait_until_ready()
+                channel = await self.client.fetch_channel(channel_id)#type: ignore
+            assert isinstance(channel,DiscordChannel)
+            self.channels.put(channel_id,channel)
+        return channel
+    def message_handle(self,channel:DiscordChannel,message_id:MessageId) -> discord.Message|discord.PartialMessage:
+        """returns the cached discord.Message for message_id, or else a PartialMessage which needs no request to make"""
+        discord_message = self.messages.get(message_id)
+        if discord_message is None:
+            assert isinstance(message_id,int)
+            return channel.get_partial_message(message_id)
+        return discord_message
 
     @override
     async def _send(self, message: Message):
-        if message.content is not None:
-            if len(message.content) > MESSAGE_MAX_LENGTH:
+        render = message.render()
+        if render.content is not None:
+            if len(render.content) > MESSAGE_MAX_LENGTH:
                 sub_messages = message.split(
                     length=MESSAGE_MAX_LENGTH,
                     add_start="--MESSAGE TOO LONG. WAS SPLIT--\n",
                     add_end="\n--END MESSAGE--",
                     add_join_end="\n--SPLIT END--",
-                    add_join_start="\n--SPLIT START--")
+                    add_join_start="\n--SPLIT START--",
+                    attach=False)
                 for sub_message in sub_messages:
                     await self._send(sub_message)
                 return
-        if message.bullet_points:
-            message = Add_Bullet_Points_To_Content_Alias_Message(message)
-        if message.channel_id is None:
-            assert isinstance(self.default_channel,int)
-            channel = self.client.get_channel(self.default_channel)
-        else:
-            assert isinstance(message.channel_id,int)
-            channel = self.client.get_channel(message.channel_id)
-        assert isinstance(channel,DiscordChannel)
-        attachments:list[discord.File] = []
-        if message.attach_paths is not None:
-            for path in message.attach_paths:
-                attachments.append(discord.File(path))
-        if message.message_id is None and message.reply_to_id is not None:
-            await self.client.wait_until_ready()
-            assert isinstance(message.reply_to_id,int)
-            to_reply = await channel.fetch_message(message.reply_to_id)
-            discord_message = await to_reply.reply(
-                content=message.content,
-                files=attachments
-            )
+        if render.bullet_points:
+            message = Add_Bullet_Points_To_Content_Alias_Message(message,attach=False)
+            render = message.render()
+        channel = await self.get_channel(self.default_channel if render.channel_id is None else render.channel_id)
+        channel_id:ChannelId = channel.id#type: ignore
+        paths:list[Attachment] = render.attach_paths or []
+        def make_attachments() -> list[discord.File|discord.Attachment]:
+            #made for each attempt, as a retried request would otherwise find its files already read
+            return self.attachment_store.prepare(render.message_id,paths)
+        discord_message:discord.Message|discord.PartialMessage
+        sent = fingerprint(render)
+        components:bool = uses_components(render)
+        def make_view() -> Optional[discord.ui.View]:
+            return option_view(render.bullet_points) if components else None#type: ignore
+        if render.message_id is None and render.reply_to_id is not None:
+            assert isinstance(render.reply_to_id,int)
+            reply_to_id:int = render.reply_to_id
+            async def reply() -> discord.Message:
+                await self.client.wait_until_ready()
+                #a partial message is all a reference needs, so the message replied to is not fetched
+                return await channel.send(
+                    content=render.content,
+                    files=make_attachments(),#type: ignore
+                    reference=channel.get_partial_message(reply_to_id),
+                    view=make_view()#type: ignore
+                )
+            discord_message = await self.queue.submit(channel_id,'message',PROMPT_PRIORITY,reply)
+            self.attachment_store.count(None,paths)
             message.message_id = discord_message.id#type: ignore
-        elif message.message_id is None:#new message
-            await self.client.wait_until_ready()
-            discord_message = await channel.send(
-                content=message.content 
-                if message.content not in (None,'') else "--empty--",
-                files = attachments)
+            self.gi.register_message_id(message)
+        elif render.message_id is None:#new message
+            async def send() -> discord.Message:
+                await self.client.wait_until_ready()
+                return await channel.send(
+                    content=render.content 
+                    if render.content not in (None,'') else "--empty--",
+                    files = make_attachments(),#type: ignore
+                    view = make_view())#type: ignore
+            discord_message = await self.queue.submit(channel_id,'message',PROMPT_PRIORITY,send)
+            self.attachment_store.count(None,paths)
             message.message_id = discord_message.id#type:ignore
+            self.gi.register_message_id(message)
         else:#edit old message
-            assert isinstance(message.message_id,int)
-            await self.client.wait_until_ready()
-            discord_message:discord.Message = await channel.fetch_message(message.message_id)
-            await discord_message.edit(content=message.content,attachments=attachments)
+            assert isinstance(render.message_id,int)
+            message_id:int = render.message_id
+            previous = self.fingerprints.get(render.message_id)
+            if previous == sent:
+                logger.debug(f"skipping edit of message {message_id}, which would change nothing")
+                self.attachment_store.skip(paths)
+                discord_message = self.message_handle(channel,message_id)#type: ignore
+            else:
+                #unchanged attachments are left in place rather than uploaded again
+                reattach:bool = previous is None or previous.attachment_hashes != sent.attachment_hashes
+                #likewise, the buttons are only replaced when the options have changed
+                reoption:bool = previous is None or previous.bullet_points != sent.bullet_points
+                async def edit() -> discord.Message:
+                    await self.client.wait_until_ready()
+                    handle = self.message_handle(channel,message_id)#type: ignore
+                    kwargs:dict[str,Any] = {'content' : render.content}
+                    if reattach:
+                        kwargs['attachments'] = make_attachments()
+                    if reoption:
+                        kwargs['view'] = make_view()
+                    return await handle.edit(**kwargs)
+                discord_message = await self.queue.submit(channel_id,'message',STATUS_PRIORITY,edit)
+                if reattach:
+                    self.attachment_store.count(message_id,paths)
+                else:
+                    self.attachment_store.skip(paths)
             message.message_id = discord_message.id#type:ignore
-        if message.bullet_points:#STILL BREAKS SOMETIMES!!!!!!!!!!!!!!!!!!!!!!!!
-            for bp in message.bullet_points:
-                if bp.emoji is not None:
-                    emoji = discord.PartialEmoji(name = bp.emoji)
-                    success = False
-                    while not success:
-                        try:
-                            await self.client.wait_until_ready()
-                            await discord_message.add_reaction(emoji)
-                            success = True
-                        except Exception as e:#not sure what the actual exceptions are
-                            logger.error(f"failed to add bullet points due to:\n{type(e)}: {e}")
-                            sleep(SLEEP429)
+            self.gi.register_message_id(message)
+        self.fingerprints[message.message_id] = sent#type: ignore
+        if components:
+            self.component_messages[message.message_id] = channel_id#type: ignore
+        else:
+            self.component_messages.pop(message.message_id,None)#type: ignore
+        if isinstance(discord_message,discord.Message):
+            self.messages.put(message.message_id,discord_message)#type: ignore
+            if paths:
+                self.attachment_store.remember(discord_message,paths)
+        if render.bullet_points and not components:
+            reacted = self.reactions.setdefault(message.message_id,set())#type: ignore
+            async def add_reaction(emoji:str):
+                await self.client.wait_until_ready()
+                try:
+                    await discord_message.add_reaction(discord.PartialEmoji(name = emoji))
+                except Exception:
+                    reacted.discard(emoji)#so that the next send tries again
+                    raise
+            #reactions are left to the queue rather than awaited, so that the game can carry on while they are added in order;
+            #only those not already on the message are added
+            for bp in render.bullet_points:
+                if bp.emoji is not None and bp.emoji not in reacted:
+                    reacted.add(bp.emoji)
+                    future = self.queue.submit(channel_id,'reaction',REACTION_PRIORITY,partial(add_reaction,bp.emoji))
+                    future.add_done_callback(log_send_failure)
+    @override
+    async def _retire(self,message_id:MessageId):
+        channel_id = self.component_messages.pop(message_id,None)
+        if channel_id is None:
+            return
+        previous = self.fingerprints.get(message_id)
+        if previous is not None:
+            #so that sending the message with its options again puts its buttons back
+            self.fingerprints[message_id] = dataclasses.replace(previous,bullet_points=())
+        channel = await self.get_channel(channel_id)
+        assert isinstance(message_id,int)
+        async def take_down() -> discord.Message:
+            await self.client.wait_until_ready()
+            return await self.message_handle(channel,message_id).edit(view=None)
+        future = self.queue.submit(channel_id,'message',STATUS_PRIORITY,take_down)
+        future.add_done_callback(log_send_failure)
+    async def retire_all(self):
+        """takes down the buttons of every message still showing them"""
+        for message_id in list(self.component_messages):
+            await self._retire(message_id)
     @override
     def format_players_md(self, players: Iterable[PlayerId]) -> str:
         return wordify_iterable(f"<@{player}>" for player in players)
@@ -137,6 +514,18 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
         Channel_Limited_Game_Interface.__init__(self)
         self.channel_id = channel_id
         self.players = players
+        self.live_channel_ids:set[ChannelId] = {channel_id}
+        "the main channel and every thread made by this interface; events elsewhere are dropped"
+        self.player_ids:frozenset[PlayerId] = frozenset(players)
+        self.idle_threads:dict[frozenset[PlayerId],list[discord.Thread]] = {}
+        "archived threads kept between games to be reused, by the players added to them"
+        self.active_threads:dict[ChannelId,tuple[frozenset[PlayerId],discord.Thread]] = {}
+        "the threads handed out to the running game, with the players added to them"
+        self.membership_semaphore = asyncio.Semaphore(config['thread_setup_concurrency'])
+        "bounds how many thread membership changes are made at once"
+        self.option_selections:dict[MessageId,dict[PlayerId,set[int]]] = {}
+        "the options each player has toggled on with buttons, by message; buttons, unlike reactions, hold no state of their own"
+        self.command_prefix:str = config['command_prefix']
         
         intents = discord.Intents.default()
         intents.message_content = True
@@ -151,6 +540,8 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
         @self.client.event
         async def on_ready():#triggers when client is logged into discord
             if self.first_intialization:
+                #before anything can pool threads of its own, so that none are pooled twice
+                await self._adopt_threads()
                 for callback in self.on_start_callbacks:
                     await callback()
                 self.first_intialization = False
@@ -158,6 +549,8 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                 await self.reconnect()
         @self.client.event
         async def on_message(payload:discord.Message):#triggers when client
+            if not self.is_relevant_event(payload.channel.id,payload.author.id,payload.content):#type:ignore
+                return
             if (self.client.user is None or 
                 payload.author.id != self.client.user.id):
                 interaction = Interaction('send_message')
@@ -165,6 +558,9 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                 await self._trigger_action(interaction)
         @self.client.event
         async def on_raw_message_edit(payload:discord.RawMessageUpdateEvent):
+            if payload.cached_message is None or not self.is_relevant_event(
+                    payload.channel_id,payload.cached_message.author.id,payload.cached_message.content):#type:ignore
+                return
             if (
                 payload.cached_message is not None and
                 (self.client.user is None or 
@@ -180,6 +576,9 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                 await self._trigger_action(interaction)
         @self.client.event
         async def on_raw_message_delete(payload:discord.RawMessageDeleteEvent):
+            if payload.cached_message is None or not self.is_relevant_event(
+                    payload.channel_id,payload.cached_message.author.id,payload.cached_message.content):#type:ignore
+                return
             if (
                 payload.cached_message is not None and
                 (self.client.user is None or 
@@ -190,7 +589,52 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                 interaction.interaction_id = payload.message_id#type:ignore
                 await self._trigger_action(interaction)
         @self.client.event
+        async def on_interaction(payload:discord.Interaction):
+            if payload.type != discord.InteractionType.component or payload.message is None:
+                return
+            custom_id = (payload.data or {}).get('custom_id')
+            if not isinstance(custom_id,str) or not custom_id.startswith(OPTION_CUSTOM_ID_PREFIX):
+                return
+            message_id:MessageId = payload.message.id#type:ignore
+            if (message_id not in self.message_registry or
+                not self.is_relevant_event(payload.channel_id,payload.user.id)):#type:ignore
+                await payload.response.send_message("You can't respond to this.",ephemeral=True)
+                return
+            message = self.find_tracked_message(message_id)
+            choice_index = int(custom_id[len(OPTION_CUSTOM_ID_PREFIX):])
+            if message is None or message.bullet_points is None or choice_index >= len(message.bullet_points):
+                await payload.response.send_message("This option is no longer available.",ephemeral=True)
+                return
+            player:PlayerId = payload.user.id#type:ignore
+            selected = self.option_selections.setdefault(message_id,{}).setdefault(player,set())
+            bullet_point = message.bullet_points[choice_index]
+            interaction:Interaction
+            if self.is_single_selection(message):
+                #buttons show no state, so on a single selection input a press always chooses its option, replacing any other
+                selected.clear()
+                selected.add(choice_index)
+                interaction = Interaction('select_option')
+                await payload.response.send_message(f"You selected {bullet_point}.",ephemeral=True)
+            #otherwise a button press toggles its option, as adding or removing a reaction would
+            elif choice_index in selected:
+                selected.remove(choice_index)
+                interaction = Interaction('deselect_option')
+                await payload.response.send_message(f"You deselected {bullet_point}.",ephemeral=True)
+            else:
+                selected.add(choice_index)
+                interaction = Interaction('select_option')
+                await payload.response.send_message(f"You selected {bullet_point}.",ephemeral=True)
+            interaction.content = bullet_point.emoji
+            interaction.player_id = player
+            interaction.reply_to_message_id = message_id
+            interaction.interaction_id = payload.id#type:ignore
+            interaction.choice_index = choice_index
+            await self._trigger_action(interaction)
+        @self.client.event
         async def on_raw_reaction_add(payload:discord.RawReactionActionEvent):
+            if (payload.message_id not in self.message_registry or#type:ignore
+                not self.is_relevant_event(payload.channel_id,payload.user_id)):#type:ignore
+                return
             if (self.client.user is None or payload.user_id != self.client.user.id):
                 emoji:str = str(payload.emoji)
                 interaction = Interaction('select_option')
@@ -210,6 +654,9 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                             await self._trigger_action(interaction)
         @self.client.event
         async def on_raw_reaction_remove(payload:discord.RawReactionActionEvent):
+            if (payload.message_id not in self.message_registry or#type:ignore
+                not self.is_relevant_event(payload.channel_id,payload.user_id)):#type:ignore
+                return
             if (self.client.user is None or payload.user_id != self.client.user.id):
                 emoji:str = str(payload.emoji)
                 interaction = Interaction('deselect_option')
@@ -227,28 +674,154 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
                                 break
                         if interaction.choice_index is not None:
                             await self._trigger_action(interaction)
+    def is_relevant_event(self,channel_id:ChannelId,user_id:PlayerId,content:Optional[str] = None) -> bool:
+        """
+        a cheap check, made before any Interaction is built, of whether a gateway event could matter to the game;
+        the event must be on a live channel, and either come from a player or be a command
+        """
+        if channel_id not in self.live_channel_ids:
+            return False
+        if user_id in self.player_ids:
+            return True
+        return content is not None and content.startswith(self.command_prefix)
     @override
     async def reset(self):
         await super().reset()
+        if isinstance(self.default_sender,Discord_Sender):
+            await self.default_sender.retire_all()
+            self.default_sender.forget()
+        self.option_selections.clear()
+        active = list(self.active_threads.values())
+        self.active_threads.clear()
+        await self._release_threads(active)
+    @override
+    async def prepare_channels(self):
+        """makes an archived thread for each player who has none in the pool, as long as the pool has room"""
+        if not config['prewarm_threads']:
+            return
+        missing = list(player for player in self.players if not self.idle_threads.get(frozenset((player,))))
+        missing = missing[:max(config['thread_pool_size'] - self.num_idle_threads(),0)]
+        async def prewarm(player:PlayerId):
+            main_channel = await self.main_channel()
+            thread = await main_channel.create_thread(name = IDLE_THREAD_NAME,auto_archive_duration=THREAD_AUTO_ARCHIVE)
+            await self._change_membership(thread,(player,),())
+            thread = await thread.edit(archived = True)
+            self.idle_threads.setdefault(frozenset((player,)),[]).append(thread)
+        results = await asyncio.gather(*(prewarm(player) for player in missing),return_exceptions=True)
+        for result in results:
+            if isinstance(result,Exception):
+                logger.error(f"failed to prewarm a thread with {result!r}")
+        logger.info(f"prewarmed {len(results)} threads, {self.num_idle_threads()} now unused")
+    async def main_channel(self) -> discord.TextChannel:
         await self.client.wait_until_ready()
         assert isinstance(self.channel_id,int)
-        channel = self.client.get_channel(self.channel_id)
-        assert isinstance(channel,discord.TextChannel)
-        for thread in channel.threads:
-            await thread.delete()
+        main_channel = self.client.get_channel(self.channel_id)
+        assert isinstance(main_channel,discord.TextChannel)
+        return main_channel
+    def num_idle_threads(self) -> int:
+        return sum(len(threads) for threads in self.idle_threads.values())
+    def pooled_thread_ids(self) -> set[ChannelId]:
+        """returns the ids of every thread in the pool, whether idle or handed out"""
+        ids:set[ChannelId] = set(self.active_threads)
+        ids.update(thread.id for threads in self.idle_threads.values() for thread in threads)#type:ignore
+        return ids
+    async def _change_membership(self,thread:discord.Thread,add:Iterable[PlayerId],remove:Iterable[PlayerId]):
+        """adds and removes players from thread concurrently, with at most thread_setup_concurrency changes in flight"""
+        async def change(player:PlayerId,adding:bool):
+            assert isinstance(player,int)
+            async with self.membership_semaphore:
+                if adding:
+                    await thread.add_user(discord.Object(player))
+                else:
+                    await thread.remove_user(discord.Object(player))
+        await asyncio.gather(
+            *(change(player,True) for player in add),
+            *(change(player,False) for player in remove)
+        )
+    def _take_idle_thread(self,members:frozenset[PlayerId]) -> Optional[tuple[frozenset[PlayerId],discord.Thread]]:
+        """
+        removes and returns an idle thread, with the players added to it, for members to use;
+        one with exactly members is preferred, otherwise the one with the fewest players to remove, 
+        so long as that is no more than making a new thread would add;
+        only threads every one of members was already in are reused, as the thread's history is kept
+        """
+        best:Optional[frozenset[PlayerId]] = None
+        if self.idle_threads.get(members):
+            best = members
+        else:
+            for key,threads in self.idle_threads.items():
+                cost = len(key - members)
+                if threads and key >= members and cost <= len(members) and (best is None or cost < len(best - members)):
+                    best = key
+        if best is None:
+            return None
+        threads = self.idle_threads[best]
+        thread = threads.pop()
+        if not threads:
+            del self.idle_threads[best]
+        return best,thread
+    async def _release_threads(self,threads:list[tuple[frozenset[PlayerId],discord.Thread]]):
+        """archives and renames threads into the pool, deleting any that do not fit in it; threads already idle in the pool are left alone"""
+        idle_ids = set(thread.id for pooled in self.idle_threads.values() for thread in pooled)
+        threads = list(
+            (members,thread) for members,thread in 
+            {thread.id:(members,thread) for members,thread in threads}.values() 
+            if thread.id not in idle_ids)
+        room = max(config['thread_pool_size'] - self.num_idle_threads(),0)
+        async def release(members:frozenset[PlayerId],thread:discord.Thread,keep:bool):
+            self.live_channel_ids.discard(thread.id)#type:ignore
+            try:
+                if not keep:
+                    await thread.delete()
+                    return
+                if thread.name != IDLE_THREAD_NAME or not thread.archived:
+                    thread = await thread.edit(name = IDLE_THREAD_NAME,archived = True)
+            except discord.HTTPException as e:
+                logger.error(f"failed to release thread {thread.id} with {e!r}")
+                return
+            self.idle_threads.setdefault(members,[]).append(thread)
+        await asyncio.gather(*(release(members,thread,i < room) for i,(members,thread) in enumerate(threads)))
+    async def _adopt_threads(self):
+        """adds the private threads this bot left in the main channel, on an earlier run, to the pool"""
+        main_channel = await self.main_channel()
+        assert self.client.user is not None
+        bot_id = self.client.user.id
+        threads:list[discord.Thread] = list(main_channel.threads)
+        try:
+            async for thread in main_channel.archived_threads(private = True,joined = True):
+                threads.append(thread)
+        except discord.HTTPException as e:
+            logger.error(f"failed to list archived threads with {e!r}")
+        pooled = self.pooled_thread_ids()
+        threads = list(
+            {thread.id:thread for thread in threads 
+            if thread.owner_id == bot_id and thread.type == discord.ChannelType.private_thread and thread.id not in pooled}.values())
+        async def members(thread:discord.Thread) -> frozenset[PlayerId]:
+            async with self.membership_semaphore:
+                thread_members = await thread.fetch_members()
+            return frozenset(member.id for member in thread_members if member.id != bot_id)#type:ignore
+        member_sets = await asyncio.gather(*(members(thread) for thread in threads),return_exceptions=True)
+        adopted:list[tuple[frozenset[PlayerId],discord.Thread]] = []
+        for thread,member_set in zip(threads,member_sets):
+            if isinstance(member_set,BaseException):
+                logger.error(f"failed to fetch members of thread {thread.id} with {member_set!r}")
+            else:
+                adopted.append((member_set,thread))
+        await self._release_threads(adopted)
+        logger.info(f"adopted {len(adopted)} leftover threads, {self.num_idle_threads()} now unused")
     async def reconnect(self):
         """this method is called by discord.py when we have gotten on_ready more than once to hopefully ensure the game remains functional"""
         #ISSUE1: after reconnect message.reference seems to sometimes be None when it shouldn't be
         #POSSIBLE SOLUTION: fetch all currently tracked messages to hopefully pu them in the discord cach or somesuch
         logger.warning("reconnecting after discord service reconnect")
         logger.warning("attempting to fetch tracked messages")
-        channels:set[ChannelId|None] = set(message.channel_id for message in self.tracked_messages)
+        channels:set[ChannelId|None] = set(message.channel_id for message in self.tracked_messages.values())
         for channel in channels:
             channel_id:ChannelId = channel if channel is not None else self.channel_id
             assert channel_id is int
             channel = self.client.get_channel(channel_id)
             assert isinstance(channel,DiscordChannel)
-            for message_id,message in ((message.message_id,message) for message in self.tracked_messages if message.channel_id == channel):
+            for message_id,message in ((message.message_id,message) for message in self.tracked_messages.values() if message.channel_id == channel):
                 if message_id is not None:
                     assert message_id is int
                     partial = channel.get_partial_message(message_id)
@@ -278,25 +851,28 @@ class Discord_Game_Interface(Channel_Limited_Game_Interface):
         return emoji
     @override
     async def _new_channel(self, name: Optional[str], who_can_see: Optional[Iterable[PlayerId]]) -> ChannelId:
-        assert isinstance(self.channel_id,int)
-        main_channel = self.client.get_channel(self.channel_id)
-        assert isinstance(main_channel,discord.TextChannel)
-        thread = None
+        if name is None:
+            name = ""
+        members:frozenset[PlayerId] = frozenset(who_can_see) if who_can_see is not None else frozenset()
+        thread:Optional[discord.Thread] = None
         while thread is None:
-            if name is None:
-                name = ""
-            await self.client.wait_until_ready()
-            thread = await main_channel.create_thread(
-                name = name,
-                auto_archive_duration=10080#waits 7 days until it hides the thread
-                )
-        if who_can_see is not None:
-            for player in who_can_see:
-                assert isinstance(player,int)
-                user = self.client.get_user(player)
-                assert user is not None#user not found
-                await self.client.wait_until_ready()
-                await thread.add_user(user)
+            taken = self._take_idle_thread(members)
+            if taken is None:
+                main_channel = await self.main_channel()
+                thread = await main_channel.create_thread(
+                    name = name,
+                    auto_archive_duration=THREAD_AUTO_ARCHIVE
+                    )
+                await self._change_membership(thread,members,())
+            else:
+                pooled_members,pooled_thread = taken
+                try:
+                    thread = await pooled_thread.edit(name = name,archived = False)
+                except discord.NotFound:#deleted by hand since it was pooled
+                    continue
+                await self._change_membership(thread,members - pooled_members,pooled_members - members)
+        self.active_threads[thread.id] = (members,thread)#type:ignore
+        self.live_channel_ids.add(thread.id)#type:ignore
         return thread.id#type:ignore
     @override
     def get_players(self) -> frozenset[PlayerId]:
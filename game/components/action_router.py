@@ -0,0 +1,114 @@
+from typing import Awaitable, Callable, Hashable, Iterable, Literal, Optional
+
+from game.components.interaction import Interaction, InteractionType
+
+type Action = Callable[[Interaction],Awaitable]
+type RouteKey = Literal['reply_to_message_id','channel_id','player_id']
+type Bucket = dict[int,'Route']
+
+ROUTE_KEYS:tuple[RouteKey,...] = ('reply_to_message_id','channel_id','player_id')
+"""the Interaction attributes actions can be indexed by, in order of how selective they tend to be"""
+
+class Route(object):
+    """
+    a single registered action, along with the values an interaction must match for the action to be called
+
+    order: the registration order of the route, used so that actions are still called in the order they were added
+
+    filters: for each RouteKey given, the set of values the interaction's attribute must be one of
+
+    ordered: whether interactions must reach this route strictly one after another alongside its owner's other routes
+    """
+    def __init__(
+            self,order:int,action:Action,owner:Hashable,
+            interaction_type:InteractionType,filters:dict[RouteKey,frozenset[Hashable]],
+            ordered:bool = True):
+        self.order = order
+        self.action = action
+        self.owner = owner
+        self.interaction_type = interaction_type
+        self.filters = filters
+        self.ordered = ordered
+        self.locations:list[tuple[dict,Hashable]] = []
+    def matches(self,interaction:Interaction) -> bool:
+        """returns whether the interaction satisfies every filter of this route"""
+        return all(getattr(interaction,key) in values for key,values in self.filters.items())
+
+class Action_Router(object):
+    """
+    stores actions by InteractionType and by the most selective filter they were registered with;
+    routing an interaction only looks at the buckets it could match, and purging an owner only touches that owner's routes
+    """
+    def __init__(self):
+        self._order:int = 0
+        self._catch_all:dict[InteractionType,Bucket] = {}
+        self._index:dict[tuple[InteractionType,RouteKey],dict[Hashable,Bucket]] = {}
+        self._owned:dict[Hashable,Bucket] = {}
+    def __len__(self) -> int:
+        return sum(len(routes) for routes in self._owned.values())
+    def clear(self):
+        """removes all routes"""
+        self._catch_all.clear()
+        self._index.clear()
+        self._owned.clear()
+    def add(
+            self,interaction_type:InteractionType,action:Action,owner:Hashable = None,
+            reply_to_message_ids:Optional[Iterable[Hashable]] = None,
+            channel_ids:Optional[Iterable[Hashable]] = None,
+            player_ids:Optional[Iterable[Hashable]] = None,
+            ordered:bool = True) -> Route:
+        """
+        registers an action to be routed interactions of interaction_type
+
+        owner: can be of any type that is hashable, and is merely used for locating the action for purgeing
+
+        reply_to_message_ids, channel_ids, player_ids: if given, the action will only be routed interactions whose corresponding attribute is in the given values
+
+        ordered: whether the action must be run in order with the owner's other ordered actions
+        """
+        given:dict[RouteKey,Optional[Iterable[Hashable]]] = {
+            'reply_to_message_id' : reply_to_message_ids,
+            'channel_id' : channel_ids,
+            'player_id' : player_ids
+        }
+        filters:dict[RouteKey,frozenset[Hashable]] = {
+            key:frozenset(values) for key,values in given.items() if values is not None
+        }
+        route = Route(self._order,action,owner,interaction_type,filters,ordered)
+        self._order += 1
+        index_key:RouteKey|None = next((key for key in ROUTE_KEYS if key in filters),None)
+        if index_key is None:
+            route.locations.append((self._catch_all,interaction_type))
+        else:
+            values = self._index.setdefault((interaction_type,index_key),{})
+            for value in filters[index_key]:
+                route.locations.append((values,value))
+        route.locations.append((self._owned,owner))
+        for parent,key in route.locations:
+            parent.setdefault(key,{})[route.order] = route
+        return route
+    def purge(self,owner:Hashable = None) -> int:
+        """removes all routes registered to owner, returning how many there were"""
+        routes = self._owned.get(owner)
+        if routes is None:
+            return 0
+        num_routes = len(routes)
+        for route in list(routes.values()):
+            for parent,key in route.locations:
+                bucket:Bucket = parent[key]
+                del bucket[route.order]
+                if not bucket:
+                    del parent[key]
+        return num_routes
+    def route(self,interaction:Interaction) -> list[Route]:
+        """returns the routes matching the interaction in the order they were added"""
+        candidates:list[Route] = list(self._catch_all.get(interaction.interaction_type,{}).values())
+        for key in ROUTE_KEYS:
+            values = self._index.get((interaction.interaction_type,key))
+            if values is None:
+                continue
+            bucket = values.get(getattr(interaction,key))
+            if bucket is not None:
+                candidates.extend(route for route in bucket.values() if route.matches(interaction))
+        candidates.sort(key=lambda route: route.order)
+        return candidates
@@ -0,0 +1,126 @@
+import copy
+from typing import TYPE_CHECKING, Any, Awaitable, Optional, Self, override
+
+from game.components.scheduler import Timer
+
+if TYPE_CHECKING:
+    from game.components.player_input import Player_Input
+
+class Completion_Policy(object):
+    """
+    decides when a Player_Input has received enough responses to be complete;
+    policies are given to inputs as configuration, and each input works with its own copy made by for_input
+
+    the base policy is complete once every player has a valid response
+    """
+    def __init__(self):
+        self.player_input:Optional['Player_Input[Any]'] = None
+        self.expired:bool = False
+        "whether a deadline set by the policy has passed"
+        self._timer:Optional[Timer] = None
+    def for_input(self,player_input:'Player_Input[Any]') -> Self:
+        """returns a copy of this policy for player_input to keep its state in"""
+        policy = copy.copy(self)
+        policy.player_input = player_input
+        policy.expired = False
+        policy._timer = None
+        return policy
+    @property
+    def _input(self) -> 'Player_Input[Any]':
+        assert self.player_input is not None, "policy must be made for an input with for_input"
+        return self.player_input
+    def start(self):
+        """called when the input starts running"""
+        self.stop()
+        self.expired = False
+    def stop(self):
+        """called when the input stops running, cancelling any deadline"""
+        if self._timer is not None:
+            self._input.gi.scheduler.cancel(self._timer)
+            self._timer = None
+    def update(self):
+        """called whenever the input's responses may have changed, before its completion is checked"""
+        pass
+    def is_complete(self) -> bool:
+        """returns whether the input has enough responses to finish"""
+        return self.expired or self._input.num_responded() == len(self._input.players)
+    def _set_deadline(self,delay:float):
+        """sets, or moves, the deadline after which the input is complete"""
+        if self._timer is None:
+            self._timer = self._input.gi.scheduler.schedule(delay,self._expire)
+        else:
+            self._timer = self._input.gi.scheduler.reschedule(self._timer,delay)
+    def _expire(self) -> Awaitable[None]:
+        self.expired = True
+        self._timer = None
+        #an update with no changed players is enough for everything waiting on the input to check again
+        return self._input._update([])
+
+class All_Responses(Completion_Policy):
+    """complete once every player has a valid response"""
+
+class Quorum(Completion_Policy):
+    """
+    complete once k players have valid responses, or all of them if there are fewer than k
+    """
+    def __init__(self,k:int):
+        Completion_Policy.__init__(self)
+        self.k = k
+    @override
+    def is_complete(self) -> bool:
+        return self._input.num_responded() >= min(self.k,len(self._input.players))
+
+class All_But(Completion_Policy):
+    """
+    complete once all but n players have valid responses, though always waiting for at least one
+    """
+    def __init__(self,n:int = 1):
+        Completion_Policy.__init__(self)
+        self.n = n
+    @override
+    def is_complete(self) -> bool:
+        num_players = len(self._input.players)
+        return self._input.num_responded() >= min(num_players,max(num_players-self.n,1))
+
+class Grace_After_First(Completion_Policy):
+    """
+    complete once every player has a valid response, or seconds after the first valid response
+    """
+    def __init__(self,seconds:float):
+        Completion_Policy.__init__(self)
+        self.seconds = seconds
+    @override
+    def update(self):
+        if self._timer is None and not self.expired and self._input.num_responded() > 0:
+            self._set_deadline(self.seconds)
+
+class Grace_After_Last(Completion_Policy):
+    """
+    complete once every player has a valid response, or once seconds pass without a new valid response after the first
+    """
+    def __init__(self,seconds:float):
+        Completion_Policy.__init__(self)
+        self.seconds = seconds
+        self._num_responded:int = 0
+    @override
+    def start(self):
+        Completion_Policy.start(self)
+        self._num_responded = 0
+    @override
+    def update(self):
+        num_responded = self._input.num_responded()
+        if num_responded > self._num_responded and not self.expired:
+            self._set_deadline(self.seconds)
+        self._num_responded = num_responded
+
+class Deadline_After_Majority(Completion_Policy):
+    """
+    complete once every player has a valid response, or seconds after more than half of them do
+    """
+    def __init__(self,seconds:float):
+        Completion_Policy.__init__(self)
+        self.seconds = seconds
+    @override
+    def update(self):
+        if self._timer is None and not self.expired and self._input.num_responded()*2 > len(self._input.players):
+            self._set_deadline(self.seconds)
@@ -1,29 +1,127 @@
-from typing import Any, Awaitable, Callable, Hashable, Optional, override
+from typing import Any, Callable, Hashable, Iterable, Optional, override
+import asyncio
 import os
 
 from game import get_logger
-from game.components.interaction import INTERACTION_TYPES, Interaction, InteractionType
-from game.components.message import Message, Reroute_Message
+from game.components.action_router import Action, Action_Router, Route
+from game.components.interaction import Interaction, InteractionType
+from game.components.latency_store import Latency_Store
+from game.components.message import Child_Message, Message, Reroute_Message
+from game.components.scheduler import Scheduler
 from game.components.sender import Sender
 from utils.types import ChannelId, Grouping, MessageId, PlayerId
 from config.config import config
 
 logger = get_logger(__name__)
 
-type Action = Callable[[Interaction],Awaitable]
+def log_edit_failure(future:asyncio.Future[Any]):
+    """logs the failure of a coalesced edit, which senders posting it do not wait for"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"coalesced edit failed with {future.exception()!r}")
 
 class Interface_Sender(Sender):
     """
     a sender intrinsicly linked to the game interface;
-    it stores all messages that pass by it
+    it stores all messages that pass by it, and coalesces edits to messages already sent
     """
     def __init__(self,gi:'Game_Interface'):
         Sender.__init__(self)
         self.gi = gi
+        self.edit_debounce:float = config['edit_debounce']
+        self._pending_edits:dict[MessageId,list[Any]] = {}
+        "for each message with an edit waiting to be made, [the latest Message sent for it, the future the edit will resolve]"
+        self._editing:dict[MessageId,asyncio.Task[None]] = {}
+        "the latest edit task made for each message, which any edit made after it waits for"
+        self._last_edit:dict[MessageId,float] = {}
+        "when, on the event loop's clock, the last edit to each message was started"
     @override
     async def __call__(self,message:Message) -> Any:
         self.gi.track_message(message)
-        return await self._send(message)
+        if message.message_id is None:
+            #so that edits posted before a new message are never shown after it
+            await self._wait_for_edits()
+            return await self._send(message)
+        #shielded, as the edit's future is shared by every sender of the message that it coalesced
+        return await asyncio.shield(self._coalesce(message.message_id,message))
+    @override
+    async def post(self,message:Message):
+        if message.message_id is None:
+            await self(message)
+            return
+        self.gi.track_message(message)
+        self._coalesce(message.message_id,message)
+    def _coalesce(self,message_id:MessageId,message:Message) -> asyncio.Future[Any]:
+        """
+        schedules an edit to message_id, returning a future of its result;
+        if no edit to it is in flight the edit is made at once, otherwise it waits for that one and then until edit_debounce has passed since it started,
+        sending only the latest of the messages sent for it in the meantime;
+        so an older state never follows a newer one
+        """
+        pending = self._pending_edits.get(message_id)
+        if pending is not None:
+            pending[0] = message
+            return pending[1]
+        future:asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        future.add_done_callback(log_edit_failure)
+        pending = [message,future]
+        self._pending_edits[message_id] = pending
+        previous = self._editing.get(message_id)
+        self._editing[message_id] = asyncio.create_task(self._edit(message_id,pending,previous))
+        return future
+    @override
+    async def flush(self):
+        """waits until every edit scheduled so far has been made"""
+        while self._editing:
+            await self._wait_for_edits()
+    @override
+    async def retire(self,message:Message):
+        if message.message_id is None:
+            return
+        #so that no edit still to be made to it puts back what is taken down
+        while message.message_id in self._editing:
+            await asyncio.gather(self._editing[message.message_id],return_exceptions=True)
+        await self._retire(message.message_id)
+    async def _retire(self,message_id:MessageId):
+        """lowest level definition of the Interface_Sender's retiring capabilities"""
+        pass
+    async def _wait_for_edits(self):
+        """waits for the edits scheduled so far, but not for any scheduled while waiting"""
+        if self._editing:
+            await asyncio.gather(*self._editing.values(),return_exceptions=True)
+    def cancel_edits(self):
+        """cancels every edit not yet made, for when the messages they edit are forgotten"""
+        for task in self._editing.values():
+            task.cancel()
+        for _,future in self._pending_edits.values():
+            future.cancel()
+        self._editing.clear()
+        self._pending_edits.clear()
+        self._last_edit.clear()
+    async def _edit(self,message_id:MessageId,pending:list[Any],previous:Optional[asyncio.Task[None]]):
+        future:asyncio.Future[Any] = pending[1]
+        try:
+            if previous is not None:
+                await asyncio.gather(previous,return_exceptions=True)
+                delay = self._last_edit.get(message_id,0) + self.edit_debounce - asyncio.get_running_loop().time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            #from here, later edits wait for this one rather than joining it
+            if self._pending_edits.get(message_id) is pending:
+                del self._pending_edits[message_id]
+            self._last_edit[message_id] = asyncio.get_running_loop().time()
+            result = await self._send(pending[0])
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            if self._editing.get(message_id) is asyncio.current_task():
+                del self._editing[message_id]
 
 class Game_Interface(object):
     """
@@ -31,11 +129,23 @@ class Game_Interface(object):
     this is a base class meant to be overwritten
     """
     def __init__(self):
-        self.actions:dict[InteractionType,list[Action]] = {}
-        self.action_owners:dict[Action,Hashable] = {}
+        self.router = Action_Router()
+        self.owner_locks:dict[Hashable,asyncio.Lock] = {}
+        "locks keeping each owner's ordered actions from overlapping when dispatching concurrently"
+        self.action_semaphore = asyncio.Semaphore(config['max_concurrent_actions'])
+        self.scheduler = Scheduler()
+        "owns the timeouts and warnings of every running input, so they share one sleeping task"
+        self.latency_store = Latency_Store(config['latency_path'])
+        self.game_type:Optional[str] = None
+        "the name of the type of game running, which response latencies are recorded under; None when no game is running"
         self.clear_actions()
         self.default_sender = Interface_Sender(self)
-        self.tracked_messages:list[Message] = []
+        self.tracked_messages:dict[int,Message] = {}
+        "tracked Message objects keyed by their id(), so that re-tracking the same object is free"
+        self.message_registry:dict[MessageId,Message] = {}
+        "the first tracked Message owning each known MessageId"
+        self.single_selection_messages:dict[int,Message] = {}
+        "messages, keyed by their id(), whose options are chosen one at a time, so interfaces whose options toggle can unselect the rest"
 
     async def reset(self):
         """
@@ -44,6 +154,12 @@ class Game_Interface(object):
         logger.warning("resetting game interface")
         self.purge_tracked_messages()
         self.clear_actions()
+        self.single_selection_messages.clear()
+        if isinstance(self.default_sender,Interface_Sender):
+            self.default_sender.cancel_edits()
+        self.scheduler.clear()
+        if isinstance(self.default_sender,Channel_Limited_Interface_Sender):
+            self.default_sender.reroutes.clear()
     def empty_temp(self):
         """
         empties the temp folder of all files
@@ -53,47 +169,66 @@ class Game_Interface(object):
             os.unlink(f"{config['temp_path']}/{file}")
     def track_message(self,message:Message):
         """
-        adds a message to the interfaces tracked messages list
+        adds a message to the interfaces tracked messages, if it is not already tracked, and registers its message_id if it has one
+        """
+        if id(message) not in self.tracked_messages:
+            logger.info(f"tracking object with message_id = {message.message_id}")
+            self.tracked_messages[id(message)] = message
+        self.register_message_id(message)
+    def register_message_id(self,message:Message):
+        """
+        indexes message's current message_id to the tracked message that owns it;
+        message can be the tracked message itself or any alias descended from it, such as the Content_Split_Messages and bullet point aliases made while sending;
+        should be called by senders whenever they assign a message_id
         """
-        logger.info(f"tracking object with message_id = {message.message_id}")
-        self.tracked_messages.append(message)
+        message_id = message.message_id
+        if message_id is None or message_id in self.message_registry:
+            return
+        owner:Message = message
+        while id(owner) not in self.tracked_messages:
+            if not isinstance(owner,Child_Message):
+                return
+            owner = owner.parent_message
+        logger.debug(f"registering message_id = {message_id} to tracked object {owner}")
+        self.message_registry[message_id] = owner
+    def is_single_selection(self,message:Message) -> bool:
+        """returns whether message, or any message it is derived from, has options that are chosen one at a time"""
+        owner:Optional[Message] = message
+        while owner is not None:
+            if id(owner) in self.single_selection_messages:
+                return True
+            owner = owner.parent_message if isinstance(owner,Child_Message) else None
+        return False
     def purge_tracked_messages(self):
         """
-        empties the interfaces tracked messages list
+        empties the interfaces tracked messages and their registered message_id's
         """
-        logger.info(f"untracking all messages; message_id's in {list(message.message_id for message in self.tracked_messages)}")
+        logger.info(f"untracking all messages; message_id's in {list(self.message_registry)}")
         self.tracked_messages.clear()
+        self.message_registry.clear()
     def find_tracked_message(self,message_id:MessageId) -> Message | None:
         """
         locates a Message object by the message's message_id if it can;
         returns None if there are no messages that identify with that MessageId;
-        if there are multiple messages, the interface only returns the first it encounters
+        if there are multiple messages, the interface only returns the first it registered
         """
-        for message in self.tracked_messages:
-            if message.is_message(message_id,'original'):
-                return message
-        return None
+        return self.message_registry.get(message_id)
     def clear_actions(self):
         """
         clears all on_actions
         """
-        logger.info(f"clearing all on_action events totalling {len(self.actions)}")
-        for interaction_type in INTERACTION_TYPES:
-            self.actions[interaction_type] = []
-        self.action_owners = {}
+        logger.info(f"clearing all on_action events totalling {len(self.router)}")
+        self.router.clear()
+        self.owner_locks.clear()
     def purge_actions(self, owner:Hashable = None):
         """
         removes all on_actions corresponding to the given owner, which should have been registered when the action was;
         
         owner: can be of any type that is hashable, and is merely used for locating the action for purgeing
         """
-        actions_to_purge:set[Action] = set(action for action in self.action_owners if self.action_owners[action] == owner)
-        logger.info(f"clearing all on_action events owned by {owner} totalling {len(actions_to_purge)}")
-        for action in actions_to_purge:
-            for interaction_type in self.actions:
-                while action in self.actions[interaction_type]:
-                    self.actions[interaction_type].remove(action)
-            del self.action_owners[action]
+        num_purged = self.router.purge(owner)
+        self.owner_locks.pop(owner,None)
+        logger.info(f"cleared all on_action events owned by {owner} totalling {num_purged}")
     def get_sender(self) -> Interface_Sender:
         """
         returns the default sender
@@ -105,20 +240,64 @@ class Game_Interface(object):
         called when the game interface notices a player input and decides it is an interaction;
         should be used in child classes
         """
-        logger.info(f"interaction of type = {interaction.interaction_type} with interaction_id = {interaction.interaction_id} calling {len(list(self.actions[interaction.interaction_type]))} actions")
-        for action in self.actions[interaction.interaction_type]:
-            await action(interaction)
-    def on_action(self,action_type:InteractionType,owner:Hashable = None) -> Callable[[Action],Action]:
+        routes = self.router.route(interaction)
+        logger.info(f"interaction of type = {interaction.interaction_type} with interaction_id = {interaction.interaction_id} calling {len(routes)} actions")
+        if config['action_dispatch'] == 'sequential':
+            for route in routes:
+                await route.action(interaction)
+            return
+        owner_routes:dict[Hashable,list[Route]] = {}
+        async with asyncio.TaskGroup() as task_group:
+            for route in routes:
+                if route.ordered:
+                    owner_routes.setdefault(route.owner,[]).append(route)
+                else:
+                    task_group.create_task(self._run_routes(interaction,[route]))
+            for owner,ordered_routes in owner_routes.items():
+                task_group.create_task(self._run_ordered_routes(interaction,owner,ordered_routes))
+    async def _run_routes(self,interaction:Interaction,routes:list[Route]):
+        """
+        awaits each route's action in turn;
+        errors are logged rather than raised so that they do not cancel the other owners' actions
+        """
+        for route in routes:
+            try:
+                await route.action(interaction)
+            except Exception:
+                logger.exception(f"action owned by {route.owner} failed on {interaction}")
+    async def _run_ordered_routes(self,interaction:Interaction,owner:Hashable,routes:list[Route]):
+        """
+        runs an owner's routes once every earlier interaction has finished with that owner, and within the concurrency cap
+        """
+        if owner not in self.owner_locks:
+            self.owner_locks[owner] = asyncio.Lock()
+        async with self.owner_locks[owner]:
+            async with self.action_semaphore:
+                await self._run_routes(interaction,routes)
+    def on_action(
+            self,action_type:InteractionType,owner:Hashable = None,
+            players:Optional[Iterable[PlayerId]] = None,
+            channel_ids:Optional[Iterable[ChannelId]] = None,
+            reply_to_message_ids:Optional[Iterable[MessageId]] = None,
+            ordered:bool = True) -> Callable[[Action],Action]:
         """
         stores the given function to be called on interactions matching the given interactiontype;
         returns a wrapper that stores the function, but does not change it
         
         owner: can be of any type that is hashable, and is merely used for locating the action for purgeing
+
+        players: if given, the function is only called for interactions from one of these players
+
+        channel_ids: if given, the function is only called for interactions on one of these channels
+
+        reply_to_message_ids: if given, the function is only called for interactions replying to one of these messages
+
+        ordered: if True, when dispatching concurrently the function waits for the owner's handling of earlier interactions to finish;
+        long lived actions should set it False, and are then also run outside of the concurrency cap
         """
         def wrapper(func:Action) -> Action:
             logger.info(f"adding new action seeking interactions of type = {action_type}; owned by {owner}")
-            self.actions[action_type].append(func)
-            self.action_owners[func] = owner
+            self.router.add(action_type,func,owner,reply_to_message_ids,channel_ids,players,ordered)
             return func
         return wrapper
     def get_players(self) -> frozenset[PlayerId]:
@@ -140,6 +319,12 @@ class Game_Interface(object):
         channel_id:ChannelId = await self._new_channel(name,who_can_see)
         logger.info(f"created new channel with name = {name}, player_ids = {who_can_see}, channel_id = {channel_id}")
         return channel_id
+    async def prepare_channels(self):
+        """
+        called while no game is running, so that channels games are likely to ask for can be made ahead of time;
+        may be overwritten in child classes
+        """
+        pass
 
 class Channel_Limited_Interface_Sender(Interface_Sender): 
     """
@@ -148,14 +333,18 @@ class Channel_Limited_Interface_Sender(Interface_Sender):
     """
     def __init__(self,gi:'Channel_Limited_Game_Interface'):
         Interface_Sender.__init__(self,gi)
+        self.reroutes:dict[tuple[int,ChannelId],Reroute_Message] = {}
+        "the Reroute_Message made for each (id(message),channel_id), so re-sending a message reuses one alias"
     @override
     async def __call__(self,message:Message):
-        if (message.players_who_can_see is not None) and message.channel_id is None:
+        render = message.render()
+        if (render.players_who_can_see is not None) and render.channel_id is None:
             assert isinstance(self.gi,Channel_Limited_Game_Interface)
-            message= Reroute_Message(
-                message,
-                await self.gi.who_can_see_channel(message.players_who_can_see)
-            )
+            channel_id = await self.gi.who_can_see_channel(render.players_who_can_see)
+            key = (id(message),channel_id)
+            if key not in self.reroutes:
+                self.reroutes[key] = Reroute_Message(message,channel_id,attach=False)
+            message = self.reroutes[key]
         return await Interface_Sender.__call__(self,message)
 
 class Channel_Limited_Game_Interface(Game_Interface):
@@ -165,7 +354,13 @@ class Channel_Limited_Game_Interface(Game_Interface):
     def __init__(self):
         Game_Interface.__init__(self)
         self.who_can_see_dict:dict[frozenset[PlayerId],ChannelId] = {}
+        self.pending_channels:dict[frozenset[PlayerId],asyncio.Task[ChannelId]] = {}
+        "channels still being made, so that players asking for the same channel at once share one"
         self.default_sender = Channel_Limited_Interface_Sender(self)
+    @override
+    async def reset(self):
+        await Game_Interface.reset(self)
+        self.who_can_see_dict.clear()
     async def who_can_see_channel(self,players:Grouping[PlayerId]) -> ChannelId:
         """
         creates a ChannelId that only players can see, or returns one that it already made
@@ -175,10 +370,15 @@ class Channel_Limited_Game_Interface(Game_Interface):
         if fr_players in self.who_can_see_dict:
             channel_id = self.who_can_see_dict[fr_players]
         else:
-            channel_id = await self.new_channel(
-                f"{self.default_sender.format_players(players)}'s Private Channel",
-                players
-            )
+            task = self.pending_channels.get(fr_players)
+            if task is None:
+                task = asyncio.create_task(self.new_channel(
+                    f"{self.default_sender.format_players(players)}'s Private Channel",
+                    players
+                ))
+                self.pending_channels[fr_players] = task
+                task.add_done_callback(lambda _: self.pending_channels.pop(fr_players,None))
+            channel_id = await asyncio.shield(task)
             self.who_can_see_dict[fr_players] = channel_id
         logger.info(f"channel limited game interface changing channel to id = {channel_id} so player_ids = {players} can see")
         return channel_id
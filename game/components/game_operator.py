@@ -68,6 +68,11 @@ class StateIncompatibility(CommandExit):
     def __init__(self,state:GameOperatorState, not_state:Iterable[GameOperatorState]):
         super().__init__(f"Current state '{state}' cannot be {wordify_iterable(not_state,'or')} for the purposes of this command.")
 
+def log_prepare_failure(task:asyncio.Task):
+    """logs the failure of preparing channels while idle, which nothing awaits"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"failed to prepare channels with {task.exception()!r}")
+
 
 T = TypeVar('T',bound=Callable)
 def command(func:T) -> T:
@@ -128,7 +133,14 @@ class Game_Operator(Interface_Operator):
         self.state:GameOperatorState = 'idle'
         self.game:Optional[Game] = None
         self.run_task:Optional[asyncio.Task] = None
+        self.prepare_task:Optional[asyncio.Task] = None
         self.bind()
+        self.prepare()
+    def prepare(self):
+        """has the game interface make channels ahead of time in the background, while idle"""
+        if self.prepare_task is None or self.prepare_task.done():
+            self.prepare_task = asyncio.create_task(self.gi.prepare_channels())
+            self.prepare_task.add_done_callback(log_prepare_failure)
     @command
     async def help(self,command:Optional[str]):
         """responds with the doc-string of the respective command, or with the overall commands if not command is given
@@ -194,6 +206,7 @@ class Game_Operator(Interface_Operator):
         await self.gi.reset()
         self.bind()#re-add this function to game_interface's on action list
         self.state = 'idle'
+        self.prepare()
     @command
     async def force_idle(self):
         """forces the game operator to return to an idle state
@@ -209,6 +222,7 @@ class Game_Operator(Interface_Operator):
                 self.run_task.cancel()
                 self.run_task = None
             self.state = 'idle'
+            self.prepare()
             raise Response("The running task has been cancelled.")
     @command
     async def list_games(self):
@@ -280,7 +294,7 @@ class Game_Operator(Interface_Operator):
                 raise ArgumentError(f"Containing '{CP}' in your content is not permitted.")
         await self.gi._trigger_action(interaction)
     def bind(self):
-        @self.gi.on_action('send_message',self)
+        @self.gi.on_action('send_message',self,ordered=False)#commands can run whole games, so must not hold up later commands
         async def recv_command(interaction:Interaction):
             if interaction.content is not None:
                 if interaction.content.startswith(config['command_prefix']):
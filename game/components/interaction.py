@@ -17,6 +17,9 @@ class Interaction(object):
     
     each interaction follows a designated InteractionType, but it is up to the implemantation to actually store the relavant data
     """
+    __slots__ = (
+        'player_id','interaction_id','channel_id','reply_to_message_id',
+        'content','interaction_type','choice_index')
     def __init__(
             self,
             interaction_type:InteractionType, 
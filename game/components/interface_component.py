@@ -2,7 +2,7 @@ from typing import Optional
 
 import utils.emoji_groups
 from game.components.game_interface import Game_Interface
-from game.components.message import Bullet_Point, Message
+from game.components.message import Attachment, Bullet_Point, Message
 from game.components.player_input import (
     Player_Single_Selection_Input,
     Player_Text_Input,
@@ -122,14 +122,14 @@ class Interface_Component():
         """
         return self.sender.format_players(user_id)
     async def basic_send(
-            self,content:Optional[str] = None,attachments_data:list[str] = [],
+            self,content:Optional[str] = None,attachments_data:list[Attachment] = [],
             channel_id:Optional[ChannelId] = None):
         """
         creates a message with the given parameters and sends it with self.sender
         
         content: the text content of the message
         
-        attachments_data: a list of file paths to attach to the message
+        attachments_data: a list of file paths, or Attachment_Buffers, to attach to the message
         
         channel_id: what channel to send the message on
         """
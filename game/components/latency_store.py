@@ -0,0 +1,107 @@
+import asyncio
+import json
+import math
+import os
+from typing import Iterable, Optional
+
+from config.config import config
+from game import get_logger
+from utils.types import PlayerId
+
+logger = get_logger(__name__)
+
+class Latency_Store(object):
+    """
+    a small local json store of how long players take to give their first valid response to an input, kept by game type and player;
+    only each player's most recent samples are kept, and nothing is written to disk until save
+
+    path: the json file to load from and save to
+
+    max_samples: how many of each player's most recent latencies to keep for each game type
+    """
+    def __init__(self,path:str,max_samples:int = config['latency_max_samples']):
+        self.path = path
+        self.max_samples = max_samples
+        self.latencies:dict[str,dict[str,list[float]]] = {}
+        "seconds taken, by game type and then by player, oldest first"
+        self._dirty:bool = False
+        self.load()
+    def load(self):
+        """replaces the stored latencies with those saved at path, if there are any"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path,'r') as file:
+                self.latencies = json.load(file)
+        except (OSError,ValueError):
+            logger.exception(f"failed to load latencies from '{self.path}'")
+        self._dirty = False
+    async def save(self):
+        """writes the stored latencies to path, if they have changed since last loaded or saved, without blocking the event loop"""
+        if not self._dirty:
+            return
+        #serialized here, so that latencies recorded while the file is written cannot change it mid write
+        data = json.dumps(self.latencies)
+        self._dirty = False
+        if not await asyncio.to_thread(self._write,data):
+            self._dirty = True
+    def _write(self,data:str) -> bool:
+        """writes data to path, returning whether it succeeded"""
+        directory = os.path.dirname(self.path)
+        try:
+            if directory:
+                os.makedirs(directory,exist_ok=True)
+            #written aside and swapped in, so an interrupted save cannot leave a half written store
+            with open(self.path + '.tmp','w') as file:
+                file.write(data)
+            os.replace(self.path + '.tmp',self.path)
+        except OSError:
+            logger.exception(f"failed to save latencies to '{self.path}'")
+            return False
+        return True
+    def record(self,game_type:str,player:PlayerId,latency:float):
+        """adds a sample of how many seconds player took to respond in a game of game_type"""
+        samples = self.latencies.setdefault(game_type,{}).setdefault(str(player),[])
+        samples.append(round(latency,3))
+        if len(samples) > self.max_samples:
+            del samples[:len(samples)-self.max_samples]
+        self._dirty = True
+    def samples(self,game_type:str,players:Optional[Iterable[PlayerId]] = None) -> list[float]:
+        """
+        returns every stored latency for game_type
+
+        players: if given, only these players' latencies are returned
+        """
+        by_player = self.latencies.get(game_type,{})
+        if players is None:
+            return list(latency for samples in by_player.values() for latency in samples)
+        return list(latency for player in players for latency in by_player.get(str(player),[]))
+    def percentile(self,game_type:str,percent:float,players:Optional[Iterable[PlayerId]] = None) -> Optional[float]:
+        """
+        returns the nearest rank percentile of the stored latencies for game_type, or None if there are none
+
+        players: if given, only these players' latencies are considered
+        """
+        samples = sorted(self.samples(game_type,players))
+        if not samples:
+            return None
+        rank = max(math.ceil(percent/100*len(samples)),1)
+        return samples[rank-1]
+    def adaptive_timeout(
+            self,game_type:str,players:Iterable[PlayerId],timeout:int,warnings:list[int]) -> tuple[int,list[int]]:
+        """
+        returns a timeout of the players' latency percentile times a factor, kept between a floor and a ceiling and never longer than timeout,
+        along with warnings at the same fractions of it as they were of timeout;
+        timeout and warnings are returned unchanged while there are too few samples
+        """
+        players = list(players)
+        if len(self.samples(game_type,players)) < config['latency_min_samples']:
+            return timeout,warnings
+        latency = self.percentile(game_type,config['adaptive_timeout_percentile'],players)
+        assert latency is not None
+        adapted = int(latency*config['adaptive_timeout_factor'])
+        adapted = max(config['adaptive_timeout_floor'],min(adapted,config['adaptive_timeout_ceiling']))
+        adapted = min(adapted,timeout)
+        if timeout <= 0:
+            return adapted,warnings
+        return adapted,list(int(warning*adapted/timeout) for warning in warnings)
@@ -1,3 +1,7 @@
+import dataclasses
+import hashlib
+import io
+import weakref
 from math import ceil
 from typing import TYPE_CHECKING, Callable, Literal, Optional, Sequence, TypeVar, override
 
@@ -6,6 +10,8 @@ from utils.grammar import wordify_iterable
 from utils.types import ChannelId, InteractionId, MessageId, PlayersIds
 
 if TYPE_CHECKING:
+    import PIL.Image
+
     from game.components.interaction import Interaction
 
 type MessageSearchStrictness = Literal["original","aliases","children",'sub_aliases','sub_children']
@@ -34,6 +40,7 @@ def keep(keep_value:bool) -> Modifier:
 
 class Bullet_Point(object):
     """a basic object storing the text and the emoji representations of a bullet point item"""
+    __slots__ = ('text','emoji')
     def __init__(self,text:Optional[str] = None, emoji:Optional[str] = None):
         self.text = text
         self.emoji = emoji
@@ -41,13 +48,57 @@ class Bullet_Point(object):
     def __str__(self):
         return f"{self.emoji} (*{self.text}*)"
 
+@dataclasses.dataclass(frozen=True,slots=True)
+class Attachment_Buffer(object):
+    """
+    an in memory file to attach to a message, so that generated files need never be written to disk
+
+    filename: the name the file is shown with, whose extension decides how it is displayed
+
+    data: the file's bytes
+    """
+    filename:str
+    data:bytes = dataclasses.field(repr=False)
+    digest:str = dataclasses.field(init=False,repr=False,compare=False)
+    "a hash of data, made once"
+    def __post_init__(self):
+        object.__setattr__(self,'digest',hashlib.sha256(self.data).hexdigest())
+    @classmethod
+    def from_image(cls,image:'PIL.Image.Image',filename:str = "image.png") -> 'Attachment_Buffer':
+        """encodes image in the format given by filename's extension"""
+        buffer = io.BytesIO()
+        image.save(buffer,format=filename.rsplit('.',1)[-1])
+        return cls(filename,buffer.getvalue())
+
+type Attachment = str|Attachment_Buffer
+"a path to a file on disk, or an in memory file"
+
+RENDERED_FIELDS:frozenset[str] = frozenset((
+    'content','attach_paths','channel_id','message_id',
+    'players_who_can_see','bullet_points','reply_to_id'))
+"""the Message attributes captured in a Message_Render; setting any of them bumps the message's version"""
+
+@dataclasses.dataclass(frozen=True,slots=True)
+class Message_Render(object):
+    """
+    an immutable snapshot of every property of a message, resolved all at once;
+    the lists it holds are shared with the message it came from and should not be modified
+    """
+    content:Optional[str]
+    attach_paths:Optional[list[Attachment]]
+    channel_id:Optional[ChannelId]
+    message_id:Optional[MessageId]
+    players_who_can_see:Optional[PlayersIds]
+    bullet_points:Optional[list[Bullet_Point]]
+    reply_to_id:Optional[MessageId|InteractionId]
+
 class Message(object):
     """
     an object storing all the values which can be included in a message from the bot to the players, meant to be sent with a sender; all values are optional
 
     content: the text content of the message
 
-    attach_paths: a list of sting paths directing to files to be attatched to the message
+    attach_paths: a list of sting paths directing to files, or Attachment_Buffers, to be attatched to the message
 
     channel_id: the channel on which to send the message, if None will be assigned by sender to some dafault when sent
 
@@ -57,12 +108,18 @@ class Message(object):
 
     bullet_points: a list of BulletPoint objects to display in the message
     """
+    __slots__ = (
+        'content','attach_paths','channel_id','message_id','players_who_can_see','bullet_points','reply_to_id',
+        '_version','_render','_render_version','_children','__weakref__')
     def __init__(
-            self,content:Optional[str] = None,attach_paths:Optional[list[str]] = None,
+            self,content:Optional[str] = None,attach_paths:Optional[list[Attachment]] = None,
             channel_id:Optional[ChannelId] = None,message_id:Optional[MessageId] = None, 
             players_who_can_see:Optional[PlayersIds] = None,
             bullet_points:Optional[list[Bullet_Point]] = None,
             reply_to_id:Optional[MessageId|InteractionId] = None):
+        self._version:int = 0
+        self._render:Optional[Message_Render] = None
+        self._render_version:int = -1
         self.content = content
         self.attach_paths = attach_paths
         self.channel_id = channel_id
@@ -70,7 +127,59 @@ class Message(object):
         self.players_who_can_see = players_who_can_see
         self.bullet_points = bullet_points
         self.reply_to_id = reply_to_id
-        self.children:list[Message] = []
+        self._children:Optional[weakref.WeakValueDictionary[int,Message]] = None
+    @override
+    def __setattr__(self,name:str,value):
+        object.__setattr__(self,name,value)
+        if name in RENDERED_FIELDS:
+            object.__setattr__(self,'_version',self._version+1)
+    def touch(self):
+        """marks this message as changed, for when what it renders from changes without any of its attributes being set"""
+        self._version += 1
+    def version(self) -> int:
+        """
+        returns a number that increases whenever this message, or any message it is derived from, changes
+        """
+        return self._version
+    def _resolve(self) -> Message_Render:
+        return Message_Render(
+            content = self.content,
+            attach_paths = self.attach_paths,
+            channel_id = self.channel_id,
+            message_id = self.message_id,
+            players_who_can_see = self.players_who_can_see,
+            bullet_points = self.bullet_points,
+            reply_to_id = self.reply_to_id
+        )
+    def render(self) -> Message_Render:
+        """
+        returns all of this message's properties resolved into a Message_Render;
+        the render is kept until the message's version changes, so reading it repeatedly is cheap
+        """
+        version = self.version()
+        if self._render is None or self._render_version != version:
+            self._render = self._resolve()
+            self._render_version = version
+        return self._render
+    @property
+    def children(self) -> list['Message']:
+        """
+        the child messages of this message still in use;
+        children are only weakly referenced, so ones nothing else holds on to drop out of the tree on their own
+        """
+        if self._children is None:
+            return []
+        return list(self._children.values())
+    def add_child(self,child:'Message'):
+        """adds child to this message's children"""
+        #most messages never get children, so the dictionary is only made once one is added
+        if self._children is None:
+            self._children = weakref.WeakValueDictionary()
+        self._children[id(child)] = child
+    def remove_child(self,child:'Message'):
+        """removes child from this message's children, if it is one"""
+        if self._children is not None and self._children.get(id(child)) is child:
+            del self._children[id(child)]
     def is_sent(self) -> bool:
         """return weather or not this Message object refers to an already sent message"""
         return self.message_id is not None
@@ -116,7 +225,8 @@ class Message(object):
     def split(
             self,deliminator:Optional[str] = None,length:Optional[int] = None,
             add_start = "", add_end = "",
-            add_join_start = "", add_join_end = "", rest_at_start:bool = False, rest_at_end:bool = True) -> list['Content_Split_Message']:
+            add_join_start = "", add_join_end = "", rest_at_start:bool = False, rest_at_end:bool = True,
+            attach:bool = True) -> list['Content_Split_Message']:
         """
         returns a list of Content_Split_Messages based on splitting parameters; each Content_Split_Message will have content of a poriton of this Messages content
 
@@ -135,9 +245,11 @@ class Message(object):
         rest_at_start: whether to include non-content paramaters of this message in the first split message
 
         rest_at_end: whether to include non-content parameters of this message in the last split message
+
+        attach: whether the split messages should be added to this message's children; transient splits made while sending should not be
         """
         if self.content is None:
-            return [Content_Split_Message(self,0,0,add_start,add_end,True)]
+            return [Content_Split_Message(self,0,0,add_start,add_end,True,attach)]
         splits = []
         if deliminator is not None:
             found_index = self.content.find(deliminator)
@@ -168,7 +280,7 @@ class Message(object):
             to_return.append(
                 Content_Split_Message(
                     self,splits[i],splits[i+1],
-                    start_text,end_text,include_rest
+                    start_text,end_text,include_rest,attach
                 )
             )
         return to_return
@@ -197,23 +309,49 @@ def make_no_yes_bullet_points() -> list[Bullet_Point]:
     return make_bullet_points(['no','yes'],NO_YES_EMOJI)
 
 class Child_Message(Message):
-    def __init__(self,parent_message:'Message'):
+    """
+    a message derived from a parent message;
+    the child holds its parent strongly, while the parent only weakly holds the child
+
+    attach: whether to add this message to its parent's children; wrappers that only live for a single send should not be
+    """
+    __slots__ = ('parent_message',)
+    def __init__(self,parent_message:'Message',attach:bool = True):
+        self._version = 0
+        self._render = None
+        self._render_version = -1
         self.parent_message = parent_message
-        self.parent_message.children.append(self)
-        self.children:list[Message] = []
+        self._children = None
+        if attach:
+            self.parent_message.add_child(self)
+    def release(self):
+        """removes this message from its parent's children"""
+        self.parent_message.remove_child(self)
+    @override
+    def version(self) -> int:
+        #versions only ever increase, so their sum changes whenever any along the chain do
+        return self._version + self.parent_message.version()
 
 class Alias_Message(Child_Message):
-    """creates a child message where the properties are determined from called functions"""
+    """
+    creates a child message where the properties are determined from called functions;
+    the properties are resolved together from the parent's render and kept until this message or its parents change,
+    so modifiers depending on anything else require touch() to be called when that changes
+    """
+    __slots__ = (
+        'content_modifier','attach_paths_modifier','channel_id_modifier','message_id_modifier',
+        'players_who_can_see_modifier','bullet_points_modifier','reply_to_id_mnodifier')
     def __init__(
             self,parent_message:'Message',
             content_modifier:OptionalModifier[str] = do_not_modify,
-            attach_paths_modifier:OptionalModifier[list[str]] = do_not_modify,
+            attach_paths_modifier:OptionalModifier[list[Attachment]] = do_not_modify,
             channel_id_modifier:OptionalModifier[ChannelId] = do_not_modify,
             message_id_modifier:OptionalModifier[MessageId] = do_not_modify,
             players_who_can_see_modifier:OptionalModifier[PlayersIds] = do_not_modify,
             bullet_points_modifier:OptionalModifier[list[Bullet_Point]] = do_not_modify,
-            reply_to_id_modifier:OptionalModifier[MessageId|InteractionId] = do_not_modify):
-        Child_Message.__init__(self,parent_message)
+            reply_to_id_modifier:OptionalModifier[MessageId|InteractionId] = do_not_modify,
+            attach:bool = True):
+        Child_Message.__init__(self,parent_message,attach)
         self.content_modifier = content_modifier
         self.attach_paths_modifier = attach_paths_modifier
         self.channel_id_modifier = channel_id_modifier
@@ -221,61 +359,77 @@ class Alias_Message(Child_Message):
         self.players_who_can_see_modifier = players_who_can_see_modifier
         self.bullet_points_modifier = bullet_points_modifier
         self.reply_to_id_mnodifier = reply_to_id_modifier
+    @override
+    def _resolve(self) -> Message_Render:
+        parent = self.parent_message.render()
+        return Message_Render(
+            content = self.content_modifier(parent.content),
+            attach_paths = self.attach_paths_modifier(parent.attach_paths),
+            channel_id = self.channel_id_modifier(parent.channel_id),
+            message_id = self.message_id_modifier(parent.message_id),
+            players_who_can_see = self.players_who_can_see_modifier(parent.players_who_can_see),
+            bullet_points = self.bullet_points_modifier(parent.bullet_points),
+            reply_to_id = self.reply_to_id_mnodifier(parent.reply_to_id)
+        )
     @property
     @override
     def content(self) -> str | None:
-        return self.content_modifier(self.parent_message.content)
+        return self.render().content
     @property
     @override
-    def attach_paths(self) -> list[str] | None:
-        return self.attach_paths_modifier(self.parent_message.attach_paths)
+    def attach_paths(self) -> list[Attachment] | None:
+        return self.render().attach_paths
     @property
     @override
     def channel_id(self) -> ChannelId | None:
-        return self.channel_id_modifier(self.parent_message.channel_id)
+        return self.render().channel_id
     @property
     @override
     def message_id(self) -> MessageId | None:
-        return self.message_id_modifier(self.parent_message.message_id)
+        return self.render().message_id
     @message_id.setter
     def message_id(self,message_id:MessageId):
         self.parent_message.message_id = message_id
     @property
     @override
     def players_who_can_see(self) -> PlayersIds | None:
-        return self.players_who_can_see_modifier(self.parent_message.players_who_can_see)
+        return self.render().players_who_can_see
     @property
     @override
     def bullet_points(self) -> list[Bullet_Point] | None:
-        return self.bullet_points_modifier(self.parent_message.bullet_points)
+        return self.render().bullet_points
     @property
     @override
     def reply_to_id(self) -> InteractionId|MessageId|None:
-        return self.reply_to_id_mnodifier(self.parent_message.reply_to_id)
+        return self.render().reply_to_id
 class Unique_Id_Alias_Message(Alias_Message):
     """creates an alias message capable of having its message_id set independantly of it's parent's message_id"""
+    __slots__ = ('sub_message_id',)
     def __init__(self,parent_message:'Message',
             content_modifier:OptionalModifier[str] = do_not_modify,
-            attach_paths_modifier:OptionalModifier[list[str]] = do_not_modify,
+            attach_paths_modifier:OptionalModifier[list[Attachment]] = do_not_modify,
             channel_id_modifier:OptionalModifier[ChannelId] = do_not_modify,
             players_who_can_see_modifier:OptionalModifier[PlayersIds] = do_not_modify,
-            bullet_points_modifier:OptionalModifier[list[Bullet_Point]] = do_not_modify):
+            bullet_points_modifier:OptionalModifier[list[Bullet_Point]] = do_not_modify,
+            attach:bool = True):
         self.sub_message_id= None
         Alias_Message.__init__(
             self,parent_message,content_modifier,attach_paths_modifier,
-            channel_id_modifier,lambda message_id: self.message_id,players_who_can_see_modifier,
-            bullet_points_modifier)
+            channel_id_modifier,lambda message_id: self.sub_message_id,players_who_can_see_modifier,
+            bullet_points_modifier,attach=attach)
     @Alias_Message.message_id.setter
     def message_id(self,message_id:MessageId):
         self.sub_message_id = message_id
 class Content_Split_Message(Unique_Id_Alias_Message):
     """contains a subsection of the parent message's content as according to its split function"""
+    __slots__ = ()
     def __init__(
             self,parent_message:'Message',
             start_index:int, end_index:int,
             add_start:str = "",
             add_end:str = "",
-            include_rest:bool = False):
+            include_rest:bool = False,
+            attach:bool = True):
         def index_content(content:Optional[str]) -> str | None:
             if content is not None:
                 return f"{add_start}{content[start_index:end_index]}{add_end}"
@@ -283,12 +437,14 @@ class Content_Split_Message(Unique_Id_Alias_Message):
             self,parent_message,
             content_modifier=index_content,
             attach_paths_modifier=keep(include_rest),
-            bullet_points_modifier=keep(include_rest)
+            bullet_points_modifier=keep(include_rest),
+            attach=attach
             )
     
 class Add_Bullet_Points_To_Content_Alias_Message(Alias_Message):
     """adds text representation of the bullet point list to the content as an alias"""
-    def __init__(self,parent_message:'Message'):
+    __slots__ = ()
+    def __init__(self,parent_message:'Message',attach:bool = True):
         def add_bullet_points(content:Optional[str]) -> str:
             if content is None:
                 content = ""
@@ -299,9 +455,10 @@ class Add_Bullet_Points_To_Content_Alias_Message(Alias_Message):
             else:
                 bp = wordify_iterable(str(bp) for bp in parent_message.bullet_points)
             return f"{content}{bp}"
-        Alias_Message.__init__(self,parent_message,add_bullet_points)
+        Alias_Message.__init__(self,parent_message,add_bullet_points,attach=attach)
             
 class Reroute_Message(Alias_Message):
     """creates an alias message rerouting a message's channel to a new one"""
-    def __init__(self,message:Message,channel_id:ChannelId):
-        Alias_Message.__init__(self,message,channel_id_modifier=lambda channel: channel_id)
+    __slots__ = ()
+    def __init__(self,message:Message,channel_id:ChannelId,attach:bool = True):
+        Alias_Message.__init__(self,message,channel_id_modifier=lambda channel: channel_id,attach=attach)
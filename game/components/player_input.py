@@ -1,23 +1,31 @@
 import asyncio
+from functools import partial
 from time import time
-from typing import Any, Awaitable, Callable, Optional, override, Sequence
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, override, Sequence
 from uuid import uuid4
 
 from config.config import config
-from game import correct_str, get_logger, make_player_dict
+from game import get_logger, make_player_dict
+from game.components.completion_policy import All_Responses, Completion_Policy
 from game.components.game_interface import Game_Interface
 from game.components.interaction import Interaction
-from game.components.message import Alias_Message, Message
+from game.components.message import Alias_Message, Child_Message, Message
 from game.components.response_validator import (
-    ResponseValidator,
+    AnyResponseValidator,
+    Set_Validator,
     Validation,
     default_text_validator,
+    is_async_validator,
     not_none,
+    offload,
+    validator_cost,
 )
+from game.components.scheduler import Timer
 from game.components.sender import Sender
 from utils.grammar import nice_time, ordinate
 from utils.types import (
     GS,
+    ChannelId,
     PlayerDict,
     PlayerDictOptional,
     PlayerId,
@@ -27,9 +35,13 @@ from utils.types import (
 
 type Condition = dict[Player_Input,bool]
 type OnUpdate = Callable[[],Awaitable]
+type ResponseEvent[T] = tuple[PlayerId,T]
+
+def response_snapshot(response:Any) -> Any:
+    """returns a value equal to the response for as long as the response is unchanged; sets are changed in place, so are frozen"""
+    return frozenset(response) if isinstance(response,set) else response
 
 logger = get_logger(__name__)
-SLEEP_TIME = 10
 
 class Player_Input[T](GS):
     """
@@ -37,11 +49,18 @@ class Player_Input[T](GS):
     
     meant only to be overwritten
     """
+    __slots__ = (
+        'id','timeout','warnings','name','gi','sender','who_can_see','players','responses',
+        '_receive_inputs','_response_validator','status_message','funcs_to_call_on_update',
+        'timeout_time','_hash','_updated','_validations','_streams','_streamed','completion_policy',
+        '_unsatisfied','_feedback','_stale','_status_version','_status_texts','_sent_status_version','panel',
+        '_run_start','_latency_recorded')
     def __init__(
             self,name:str, gi:Game_Interface,sender:Sender,players:PlayersIds,
-            response_validator:ResponseValidator[T] = not_none, 
+            response_validator:AnyResponseValidator[T] = not_none, 
             who_can_see:Optional[PlayersIds] = None, 
-            timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings']):
+            timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'],
+            completion_policy:Optional[Completion_Policy] = None):
         self.id = str(uuid4())
         self.timeout = timeout
         self.warnings = warnings
@@ -52,12 +71,33 @@ class Player_Input[T](GS):
         self.players:PlayersIds = tuple(players)
         self.responses:PlayerDictOptional[T] = make_player_dict(self.players,None)
         self._receive_inputs = False
-        self._response_validator:ResponseValidator[T] = response_validator
+        self._response_validator:AnyResponseValidator[T] = response_validator
+        self._validations:dict[PlayerId,tuple[Any,Validation]] = {}
+        "each player's last validation, along with a snapshot of the response it was made for"
+        self._unsatisfied:set[PlayerId] = set()
+        self._feedback:PlayerDict[str] = {}
+        self._stale:set[PlayerId] = set(self.players)
+        "players whose responses may have changed since _unsatisfied and _feedback were last brought up to date"
+        self._status_version:int = 0
+        self._status_texts:dict[bool,tuple[int,str]] = {}
+        "the response_status text for each value of basic, along with the status version it was made for"
+        self._sent_status_version:int = -1
         self.status_message = Alias_Message(
             Message(players_who_can_see=self.who_can_see),lambda content: self.response_status())
         self.funcs_to_call_on_update:list[Callable[[],Awaitable]] = []
-        self._last_response_status:str = ""
         self.timeout_time:int = 0
+        #none of these change once made, and inputs are hashed for every set operation in run_inputs
+        self._hash:int = hash((self.name,self.players,self.who_can_see,self.id))
+        self._updated:asyncio.Condition = asyncio.Condition()
+        self.completion_policy:Completion_Policy = (All_Responses() if completion_policy is None else completion_policy).for_input(self)
+        self._streams:list[asyncio.Queue[Optional[ResponseEvent[T]]]] = []
+        self._streamed:dict[PlayerId,Any] = {}
+        "a snapshot of the last response streamed for each player"
+        self.panel:Optional[Input_Panel] = None
+        "the panel showing this input's status in place of its own, if any"
+        self._run_start:Optional[float] = None
+        self._latency_recorded:set[PlayerId] = set()
+        "players whose response latency has been recorded during this run"
     @override
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self.name})"
@@ -67,27 +107,136 @@ class Player_Input[T](GS):
             logger.info(f"bound new on_update to {self}")
             self.funcs_to_call_on_update.append(func)
         return func
+    def remove_on_update(self,func:OnUpdate):
+        """unbinds a callable bound with on_update, if it is bound"""
+        if func in self.funcs_to_call_on_update:
+            self.funcs_to_call_on_update.remove(func)
+    def validate(self,player:PlayerId) -> Validation:
+        """
+        returns the validation of the player's current response;
+        the validator is only called again once the response is different from when it was last called
+        """
+        response = self.responses[player]
+        snapshot = response_snapshot(response)
+        cached = self._validations.get(player)
+        if cached is not None and cached[0] == snapshot:
+            return cached[1]
+        if is_async_validator(self._response_validator) or validator_cost(self._response_validator) != 'cheap':
+            #async and expensive validations are only made in validate_batch, off the event loop; until then the response is treated as not yet valid
+            return (False,None)
+        validation:Validation = self._response_validator(player,response)#type: ignore
+        self._validations[player] = (snapshot,validation)
+        return validation
+    async def validate_batch(self,players:Iterable[PlayerId]):
+        """
+        makes all of the players' validations that are not already cached together;
+        async validators are awaited at once, and expensive sync validators are run at once in the default executor,
+        while cheap sync validators are left for validate to call when needed
+        """
+        validator = self._response_validator
+        if not is_async_validator(validator):
+            if validator_cost(validator) == 'cheap':
+                return
+            validator = offload(validator)#type: ignore
+        pending:list[tuple[PlayerId,Any,Awaitable[Validation]]] = []
+        for player in players:
+            response = self.responses[player]
+            snapshot = response_snapshot(response)
+            cached = self._validations.get(player)
+            if cached is not None and cached[0] == snapshot:
+                continue
+            #sets continue to change in place while the validation runs, so it gets its own
+            data = set(response) if isinstance(response,set) else response
+            pending.append((player,snapshot,validator(player,data)))#type: ignore
+        if not pending:
+            return
+        validations:list[Validation] = await asyncio.gather(*(awaitable for _,_,awaitable in pending))
+        for (player,snapshot,_),validation in zip(pending,validations):
+            if response_snapshot(self.responses[player]) == snapshot:#the response may have changed while validating
+                self._validations[player] = (snapshot,validation)
+    async def revalidate(self,players:Optional[Iterable[PlayerId]] = None):
+        """
+        forgets and remakes cached validations, as with invalidate_validations and then validate_batch
+
+        players: if given, only these players' validations are remade
+        """
+        players = list(self.players if players is None else players)
+        self.invalidate_validations(players)
+        await self.validate_batch(players)
+    def invalidate_validations(self,players:Optional[Iterable[PlayerId]] = None):
+        """
+        forgets cached validations so that they are made again;
+        needed whenever something the validator depends on, other than the response itself, changes
+
+        players: if given, only these players' validations are forgotten
+        """
+        if players is not None:
+            players = list(players)
+        if isinstance(self._response_validator,Set_Validator):
+            self._response_validator.invalidate(players)
+        if players is None:
+            self._validations.clear()
+            self._stale.update(self.players)
+        else:
+            for player in players:
+                self._validations.pop(player,None)
+                self._stale.add(player)
+    def _refresh_status(self):
+        """brings the satisfied players and their feedback up to date for players whose responses may have changed"""
+        changed:bool = False
+        while self._stale:
+            player = self._stale.pop()
+            valid,feedback = self.validate(player)
+            if valid == (player in self._unsatisfied):
+                changed = True
+                if valid:
+                    self._unsatisfied.discard(player)
+                else:
+                    self._unsatisfied.add(player)
+            if feedback != self._feedback.get(player):
+                changed = True
+                if feedback is None:
+                    del self._feedback[player]
+                else:
+                    self._feedback[player] = feedback
+        if changed:
+            self._status_version += 1
+    def status_version(self) -> int:
+        """returns a number that changes whenever which players are satisfied, or the feedback they are given, changes"""
+        self._refresh_status()
+        return self._status_version
+    def num_responded(self) -> int:
+        """returns how many players have responses meeting the validator's requirements"""
+        self._refresh_status()
+        return len(self.players) - len(self._unsatisfied)
+    def players_not_responded(self) -> list[PlayerId]:
+        """returns the players whose responses do not yet meet the validator's requirements, in order"""
+        self._refresh_status()
+        return list(player for player in self.players if player in self._unsatisfied)
     def response_status(self, basic:bool = False) -> str:
         """
-        generates a string representing the current state of the input
+        generates a string representing the current state of the input;
+        the text is only remade once the status has changed
         
         basic : controls weather to include validation feedback in the returned string,
         True excludes, False includes
         """
         #returns text describing which players have not responded to this input
-        validation:PlayerDict[Validation] = {player:self._response_validator(player,self.responses[player]) for player in self.players}
-        players_not_responded = list(player for player in self.players if not validation[player][0])
-        player_text = self.sender.format_players_md(players_not_responded)
-        players_with_feedback = list(player for player in self.players if validation[player][1] is not None)
+        version = self.status_version()
+        cached = self._status_texts.get(basic)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        player_text = self.sender.format_players_md(self.players_not_responded())
         if player_text:
             to_return = f"*Waiting for {player_text} to respond to {self.name}.*"
         else:
             to_return = f"*Not waiting for anyone to respond to {self.name}.*"
         if not basic:
-            for player in players_with_feedback:
-                feedback = validation[player][1]
+            for player in self.players:
+                feedback = self._feedback.get(player)
                 if feedback is not None:
                     to_return += f"\n{self.sender.format_players_md([player])}: __{feedback}__"
+        self._status_texts[basic] = (version,to_return)
         return to_return
     def reset(self):
         """
@@ -95,6 +244,8 @@ class Player_Input[T](GS):
         """
         logger.warning(f"resetting {self}")
         self.responses = make_player_dict(self.players,None)
+        self.invalidate_validations()
+        self._streamed.clear()
     async def _setup(self):
         """run once and awaited in _run at the beggining"""
         pass
@@ -108,73 +259,184 @@ class Player_Input[T](GS):
     async def _unsetup(self):
         """run once and awaited in _run at the end"""
         pass
-    async def _update(self):
-        """called during running only when an input is changed"""
+    async def _update(self,players:Optional[Iterable[PlayerId]] = None):
+        """
+        called during running only when an input is changed
+
+        players: the players whose responses changed; if None, all players are checked again
+        """
+        #only marked stale once validated, so that a status rendered while the batch runs cannot validate them inline, or lose that they changed
+        batch = self._stale.union(self.players if players is None else players)
+        await self.validate_batch(batch)
+        self._stale.update(batch)
+        if players is not None:
+            self._record_latencies(players)
+        self.completion_policy.update()
         logger.info(f"{self} has updated, calling {len(self.funcs_to_call_on_update)} on_updates")
         await self.update_response_status()
         for func in self.funcs_to_call_on_update:
             await func()
+        if self._streams:
+            self._stream_responses(self.players if players is None else players)
+        async with self._updated:
+            self._updated.notify_all()
+    def _record_latencies(self,players:Iterable[PlayerId]):
+        """records, for the game type running, how long each of players took to first give a valid response this run"""
+        if self._run_start is None or self.gi.game_type is None:
+            return
+        now = time()
+        for player in players:
+            if player not in self._latency_recorded and self.validate(player)[0]:
+                self._latency_recorded.add(player)
+                self.gi.latency_store.record(self.gi.game_type,player,now - self._run_start)
+    def stream(self) -> AsyncIterator[ResponseEvent[T]]:
+        """
+        returns an async iterator of (player,response) for each newly accepted valid response, as the input receives them;
+        it ends once the input finishes running, whether from completion or timeout, so should be made before or while it runs;
+        no event is ever dropped, and events wait unread for as long as the reader takes rather than the input waiting for the reader,
+        as updates are streamed while interaction dispatch is held
+        """
+        queue:asyncio.Queue[Optional[ResponseEvent[T]]] = asyncio.Queue()
+        self._streams.append(queue)
+        return self._read_stream(queue)
+    async def _read_stream(self,queue:asyncio.Queue[Optional[ResponseEvent[T]]]) -> AsyncIterator[ResponseEvent[T]]:
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            if queue in self._streams:
+                self._streams.remove(queue)
+    def _stream_responses(self,players:Iterable[PlayerId]):
+        """passes the responses of players that are valid and have not been streamed already to every stream"""
+        for player in players:
+            if not self.validate(player)[0]:
+                continue
+            response = self.responses[player]
+            snapshot = response_snapshot(response)
+            if player in self._streamed and self._streamed[player] == snapshot:
+                continue
+            self._streamed[player] = snapshot
+            #readers get their own copy of sets, which continue to change in place
+            event:ResponseEvent[T] = (player,set(response) if isinstance(response,set) else response)#type: ignore
+            for queue in self._streams:
+                queue.put_nowait(event)
+    def _end_streams(self):
+        """tells every stream the input has finished, and forgets them"""
+        streams = self._streams
+        self._streams = []
+        for queue in streams:
+            queue.put_nowait(None)
+    async def wait_for_update(self):
+        """waits until the next time the input changes"""
+        async with self._updated:
+            await self._updated.wait()
+    def set_panel(self,panel:Optional['Input_Panel']):
+        """sets the panel to show this input's status in place of its own; None to show its own again"""
+        self.panel = panel
+        self.status_message.touch()
+    def panel_key(self) -> tuple[Optional[ChannelId],Optional[frozenset[PlayerId]]]:
+        """returns the channel and players which the input's status is shown to, which inputs sharing a panel must have in common"""
+        render = self.status_message.render()
+        return (render.channel_id,None if render.players_who_can_see is None else frozenset(render.players_who_can_see))
+    def is_shown(self) -> bool:
+        """returns whether every message the input needs sent before its status has been sent"""
+        return True
     async def update_response_status(self):
-        """updates status_message, if it is different"""
-        status_message_content = self.status_message.content
-        if status_message_content != self._last_response_status:
-            self._last_response_status = correct_str(status_message_content)
-            await self.sender(self.status_message)
+        """updates status_message, or the panel showing the status in its place, if it is different"""
+        if self.panel is not None:
+            await self.panel.update()
+            return
+        version = self.status_version()
+        if version != self._sent_status_version:
+            self._sent_status_version = version
+            self.status_message.touch()
+            await self.sender.post(self.status_message)
     def has_recieved_all_responses(self) -> bool:
         """returns whether all responses meet the validator's requirements"""
-        to_return:bool = all(self._response_validator(player,self.responses[player])[0] for player in self.players)
+        self._refresh_status()
+        to_return:bool = not self._unsatisfied
         logger.debug(f"{self} has evaluated that is has" + ("n't" if not to_return else "") + " received all responses")
-        return all(self._response_validator(player,self.responses[player])[0] for player in self.players)
-    async def _handle_warnings(self):
-        if self.timeout is None:
+        return to_return
+    def is_complete(self) -> bool:
+        """returns whether the input's completion policy considers it to have received enough responses"""
+        return self.completion_policy.is_complete()
+    async def _warn(self,i:int,warnings:Optional[list[int]] = None):
+        """
+        sends the ith warning to the players who have not yet responded, if there are any
+
+        warnings: the warning times in use, if not the input's own
+        """
+        if warnings is None:
+            warnings = self.warnings
+        self._refresh_status()
+        if not self._unsatisfied:
             return
-        for i in range(len(self.warnings)):
-            await asyncio.sleep(self.timeout_time-self.timeout+self.warnings[i]-int(time()))
-            players_not_responded = list(player for player in self.players if not self._response_validator(player,self.responses[player])[0])
-            if len(players_not_responded) == 0:
-                continue
-            warning_text:str
-            if i + 1 == len(self.warnings):
-                warning_text = "This is your final warning."
-            else:
-                warning_text = f"You have {len(self.warnings)-1-i} warning(s) remaining."
-            timeout_text:str = ""
-            if self.timeout is not None:
-                timeout_text = f"\nYou have {nice_time(self.timeout_time-int(time()))} to respond before timeout."
-            await self.sender(Message(
-                players_who_can_see=self.who_can_see,
-                content=f"We are still waiting on {self.sender.format_players_md(players_not_responded)} to respond to {self.name}.\n" +
-                f"This is your {ordinate(i+1)} warning at {nice_time(self.warnings[i])} of failure to respond.\n" + 
-                warning_text + timeout_text
-                ))
+        players_not_responded = self.players_not_responded()
+        warning_text:str
+        if i + 1 == len(warnings):
+            warning_text = "This is your final warning."
+        else:
+            warning_text = f"You have {len(warnings)-1-i} warning(s) remaining."
+        timeout_text:str = ""
+        if self.timeout is not None:
+            timeout_text = f"\nYou have {nice_time(self.timeout_time-int(time()))} to respond before timeout."
+        await self.sender(Message(
+            players_who_can_see=self.who_can_see,
+            content=f"We are still waiting on {self.sender.format_players_md(players_not_responded)} to respond to {self.name}.\n" +
+            f"This is your {ordinate(i+1)} warning at {nice_time(warnings[i])} of failure to respond.\n" + 
+            warning_text + timeout_text
+            ))
     async def _run(self,await_task:asyncio.Task[Any]):
         """
-        awaits's _setup, then calls _core while it awaits await_task, then calls _unsetup
+        awaits's _setup, then calls _core while it awaits await_task, then calls _unsetup;
+        the timeout and warnings are scheduled on the interface's scheduler rather than each being waited on here,
+        and are shortened to the players' recorded response latencies if adaptive_timeouts is configured
         
-        await_task : an asyncio.Task to call ayncio.wait on during running
+        await_task : an asyncio.Task to call ayncio.wait on during running, which is cancelled if the input times out
         """
+        self._run_start = time()
+        self._latency_recorded.clear()
         await self._setup()
+        self.completion_policy.start()
         await self._update()
         self._receive_inputs = True
         _core = asyncio.create_task(self._core())
-        _handle_warnings = asyncio.create_task(self._handle_warnings())
+        timers:list[Timer] = []
+        timed_out:list[bool] = [False]
         if isinstance(self.timeout,int):
-            self.timeout_time = int(time()) + self.timeout
-        try:
-            await asyncio.wait_for(await_task,timeout=self.timeout)
-        except asyncio.TimeoutError:
+            timeout,warnings = self.timeout,self.warnings
+            if config['adaptive_timeouts'] and self.gi.game_type is not None:
+                timeout,warnings = self.gi.latency_store.adaptive_timeout(self.gi.game_type,self.players,timeout,warnings)
+                logger.info(f"{self} adapted its timeout to {timeout} with warnings at {warnings}")
+            self.timeout_time = int(time()) + timeout
+            for i,warning in enumerate(warnings):
+                timers.append(self.gi.scheduler.schedule(warning,partial(self._warn,i,warnings)))
+            def on_timeout():
+                timed_out[0] = True
+                await_task.cancel()
+            timers.append(self.gi.scheduler.schedule(timeout,on_timeout))
+        await asyncio.wait([await_task])
+        self.completion_policy.stop()
+        for timer in timers:
+            self.gi.scheduler.cancel(timer)
+        if timed_out[0]:
             await self.sender(Message(
                 players_who_can_see=self.who_can_see,
                 content=f"The opportunity to respond to {self.name} has timed out."))
         _core.cancel()
-        _handle_warnings.cancel()
+        await asyncio.gather(_core,return_exceptions=True)
+        self._end_streams()
+        self._run_start = None
         await self._unsetup()
     async def wait_until_received_all(self):
         """
-        waits until has_received_all_responses, check every SLEEP_TIME seconds
+        waits until the input is complete according to its completion policy, checking again each time the input changes
         """
-        while not self.has_recieved_all_responses():
-            await asyncio.sleep(SLEEP_TIME)
+        async with self._updated:
+            await self._updated.wait_for(self.is_complete)
         self._receive_inputs = False
     async def run(self) -> PlayerDictOptional[T]:
         """
@@ -188,21 +450,24 @@ class Player_Input[T](GS):
         return self.responses
     @override
     def __hash__(self) -> int:#it is very bad that I need this
-        return hash((self.name,self.players,self.who_can_see,self.id))
+        return self._hash
 class Player_Input_In_Response_To_Message[T](Player_Input[T]):
     """
     base player input class for reacting to interactions sent by the game_interface in response to a message
 
     meant to be overwritten
     """
+    __slots__ = ('message','bound_message','allow_edits')
     def __init__(
             self, name:str, gi:Game_Interface, sender :Sender, 
-            players:PlayersIds, response_validator:ResponseValidator[T] = not_none,
+            players:PlayersIds, response_validator:AnyResponseValidator[T] = not_none,
             who_can_see:Optional[list[PlayerId]] = None, 
             timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'],
-            message:Optional[Message|str] = None, allow_edits:bool = True):
-        Player_Input.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings)
+            message:Optional[Message|str] = None, allow_edits:bool = True,
+            completion_policy:Optional[Completion_Policy] = None):
+        Player_Input.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,completion_policy)
         self.message:Message
+        self.bound_message:Alias_Message
         _message:Message
         if message is None:
             _message = Message("Respond here.",players_who_can_see=players)
@@ -213,15 +478,34 @@ class Player_Input_In_Response_To_Message[T](Player_Input[T]):
         self.bind_message(_message)
         self.allow_edits:bool = allow_edits
     def bind_message(self,message:Message) -> Message:
-        self.message = Alias_Message(message,lambda content: self.add_response_status(content))
+        self.bound_message = Alias_Message(message,lambda content: self.add_response_status(content))
+        self.message = self.bound_message
         return self.message
     @override
     def response_status(self, basic: bool = False) -> str:
         return super().response_status(basic) + f" *(Edits are {'not ' if not self.allow_edits else ''}allowed.)*"
     @override
+    def set_panel(self,panel:Optional['Input_Panel']):
+        Player_Input.set_panel(self,panel)
+        self.bound_message.touch()
+    @override
+    def panel_key(self) -> tuple[Optional[ChannelId],Optional[frozenset[PlayerId]]]:
+        render = self.message.render()
+        return (render.channel_id,None if render.players_who_can_see is None else frozenset(render.players_who_can_see))
+    @override
+    def is_shown(self) -> bool:
+        return self.message.is_sent()
+    @override
     async def update_response_status(self):
-        await self.sender(self.message)
+        if self.panel is not None:
+            await self.panel.update()
+            return
+        #touching the alias holding our status also invalidates any aliases stacked on it by multi_bind_message
+        self.bound_message.touch()
+        await self.sender.post(self.message)
     def add_response_status(self,content:str|None):
+        if self.panel is not None:
+            return content
         if content is None:
             return self.response_status()
         else:
@@ -238,10 +522,14 @@ class Player_Input_In_Response_To_Message[T](Player_Input[T]):
         if interaction.player_id not in self.players:
             logger.info(f"{interaction} ignored by {self} because its player_id was not listed for the input")
             return False
-        if not self.message.is_response(interaction):
+        #the registry holds the tracked message an id belongs to, which for a rerouted message is the reroute alias, so its parents are searched too
+        owner = self.gi.find_tracked_message(interaction.reply_to_message_id)#type:ignore
+        while owner is not None and owner is not self.message:
+            owner = owner.parent_message if isinstance(owner,Child_Message) else None
+        if owner is None and not self.message.is_response(interaction):
             logger.info(f"{interaction} ignored by {self} because it was not a response to the message")
             return False
-        val = self.allow_edits or not self._response_validator(interaction.player_id,self.responses[interaction.player_id])[0]
+        val = self.allow_edits or not self.validate(interaction.player_id)[0]
         if not val:
             logger.info(f"{interaction} ignored by {self} because edits are not allowed and they already have a valid response of '{self.responses[interaction.player_id]}'")
             return False
@@ -254,51 +542,57 @@ class Player_Input_In_Response_To_Message[T](Player_Input[T]):
     async def _unsetup(self):
         await super()._unsetup()
         self.gi.purge_actions(self)
+        if isinstance(self.message,Child_Message):
+            self.message.release()
 class Player_Text_Input(Player_Input_In_Response_To_Message[str]):
     """
     player input class for collecting text interactions to a message
     """
+    __slots__ = ()
     def __init__(
             self, name:str, gi:Game_Interface, sender :Sender, players:PlayersIds, 
-            response_validator:ResponseValidator[str] = default_text_validator,
+            response_validator:AnyResponseValidator[str] = default_text_validator,
             who_can_see:Optional[list[PlayerId]] = None, 
             timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'],
             message:Optional[Message|str] = None,
-            allow_edits:bool = True):
-        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,allow_edits)
+            allow_edits:bool = True,
+            completion_policy:Optional[Completion_Policy] = None):
+        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,allow_edits,completion_policy)
     @override
     async def _setup(self):
         await Player_Input_In_Response_To_Message._setup(self)
-        @self.gi.on_action('send_message',self)
+        @self.gi.on_action('send_message',self,players=self.players)
         async def on_message_action(interaction:Interaction):
             if self.allow_interaction(interaction):
                 assert interaction.player_id is not None
                 self.responses[interaction.player_id] = interaction.content
-                await self._update()
-        @self.gi.on_action('delete_message',self)
+                await self._update([interaction.player_id])
+        @self.gi.on_action('delete_message',self,players=self.players)
         async def on_delete_action(interaction:Interaction):
             if self.allow_interaction(interaction):
                 assert interaction.player_id is not None
                 self.responses[interaction.player_id] = None
-                await self._update()
+                await self._update([interaction.player_id])
 class Player_Multi_Text_Input(Player_Input_In_Response_To_Message[set[str]]):
+    __slots__ = ()
     def __init__(
             self, 
             name: str, 
             gi: Game_Interface, 
             sender: Sender, 
             players: PlayersIds, 
-            response_validator: Callable[[PlayerId, set[str] | None], tuple[bool, str | None]] = not_none, 
+            response_validator: AnyResponseValidator[set[str]] = not_none, 
             who_can_see: list[PlayerId] | None = None, 
             timeout: int | None = config['default_timeout'], 
             warnings: list[int] = config['default_warnings'], 
             message: Message | str | None = None, 
-            allow_edits: bool = True):
-        Player_Input_In_Response_To_Message.__init__(self,name, gi, sender, players, response_validator, who_can_see, timeout, warnings, message, allow_edits)
+            allow_edits: bool = True,
+            completion_policy: Completion_Policy | None = None):
+        Player_Input_In_Response_To_Message.__init__(self,name, gi, sender, players, response_validator, who_can_see, timeout, warnings, message, allow_edits, completion_policy)
     @override
     async def _setup(self):
         await Player_Input_In_Response_To_Message._setup(self)
-        @self.gi.on_action('send_message',self)
+        @self.gi.on_action('send_message',self,players=self.players)
         async def on_message_action(interaction:Interaction):
             if self.allow_interaction(interaction) and interaction.content is not None:
                 assert interaction.player_id is not None
@@ -307,8 +601,8 @@ class Player_Multi_Text_Input(Player_Input_In_Response_To_Message[set[str]]):
                     response = set()
                     self.responses[interaction.player_id] = response
                 response.add(interaction.content)
-                await self._update()
-        @self.gi.on_action('delete_message',self)
+                await self._update([interaction.player_id])
+        @self.gi.on_action('delete_message',self,players=self.players)
         async def on_delete_action(interaction:Interaction):
             if self.allow_interaction(interaction) and interaction.content is not None:
                 assert interaction.player_id is not None
@@ -316,49 +610,59 @@ class Player_Multi_Text_Input(Player_Input_In_Response_To_Message[set[str]]):
                 if response is None:
                     return
                 response.remove(interaction.content)
-                await self._update()
+                await self._update([interaction.player_id])
 class Player_Single_Selection_Input(Player_Input_In_Response_To_Message[int]):
     """
     player input class for collecting single choice selection interactions to a message
     """
+    __slots__ = ()
     def __init__(
             self, name:str, gi:Game_Interface, sender :Sender, players:PlayersIds, 
-            response_validator:ResponseValidator[int] = not_none, 
+            response_validator:AnyResponseValidator[int] = not_none, 
             who_can_see:Optional[list[PlayerId]] = None, 
             timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'],
             message:Optional[Message|str] = None,
-            allow_edits:bool = True):
-        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,allow_edits)
+            allow_edits:bool = True,
+            completion_policy:Optional[Completion_Policy] = None):
+        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,allow_edits,completion_policy)
     @override
     async def _setup(self):
+        self.gi.single_selection_messages[id(self.message)] = self.message
         await Player_Input_In_Response_To_Message._setup(self)
-        @self.gi.on_action('select_option',self)
+        @self.gi.on_action('select_option',self,players=self.players)
         async def on_reaction_action(interaction:Interaction):
             if self.allow_interaction(interaction):
                 assert interaction.player_id is not None
                 self.responses[interaction.player_id] = interaction.choice_index
-                await self._update()
-        @self.gi.on_action('deselect_option',self)
+                await self._update([interaction.player_id])
+        @self.gi.on_action('deselect_option',self,players=self.players)
         async def on_unreaction_action(interaction:Interaction):
             if self.allow_interaction(interaction):
                 assert interaction.player_id is not None
                 if self.responses[interaction.player_id] == interaction.choice_index:
                     self.responses[interaction.player_id] = None
-                    await self._update()
+                    await self._update([interaction.player_id])
+    @override
+    async def _unsetup(self):
+        await Player_Input_In_Response_To_Message._unsetup(self)
+        self.gi.single_selection_messages.pop(id(self.message),None)
+        await self.sender.retire(self.message)
 class Player_Multiple_Selection_Input(Player_Input_In_Response_To_Message[set[int]]):
     """
     player input class for collecting multiple choice selection interactions to a message
     """
+    __slots__ = ()
     def __init__(
             self, name:str, gi:Game_Interface, sender :Sender, players:PlayersIds, 
-            response_validator:ResponseValidator[set[int]] = not_none,
+            response_validator:AnyResponseValidator[set[int]] = not_none,
             who_can_see:Optional[list[PlayerId]] = None, 
-            timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'], message:Optional[Message|str] = None):
-        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,True)
+            timeout:Optional[int] = config['default_timeout'], warnings:list[int] = config['default_warnings'], message:Optional[Message|str] = None,
+            completion_policy:Optional[Completion_Policy] = None):
+        Player_Input_In_Response_To_Message.__init__(self,name,gi,sender,players,response_validator,who_can_see,timeout,warnings,message,True,completion_policy)
     @override
     async def _setup(self):
         await Player_Input_In_Response_To_Message._setup(self)
-        @self.gi.on_action('select_option',self)
+        @self.gi.on_action('select_option',self,players=self.players)
         async def on_reaction_action(interaction:Interaction):
             if self.allow_interaction(interaction) and interaction.choice_index is not None:
                 assert interaction.player_id is not None
@@ -367,8 +671,8 @@ class Player_Multiple_Selection_Input(Player_Input_In_Response_To_Message[set[in
                 proxy = self.responses[interaction.player_id]
                 assert isinstance(proxy,set)
                 proxy.add(interaction.choice_index)
-                await self._update()
-        @self.gi.on_action('deselect_option',self)
+                await self._update([interaction.player_id])
+        @self.gi.on_action('deselect_option',self,players=self.players)
         async def on_unreaction_action(interaction:Interaction):
             if self.allow_interaction(interaction):
                 assert interaction.player_id is not None
@@ -378,7 +682,11 @@ class Player_Multiple_Selection_Input(Player_Input_In_Response_To_Message[set[in
                     assert isinstance(proxy,set)
                     if interaction.choice_index in proxy:
                         proxy.remove(interaction.choice_index)
-                        await self._update()
+                        await self._update([interaction.player_id])
+    @override
+    async def _unsetup(self):
+        await Player_Input_In_Response_To_Message._unsetup(self)
+        await self.sender.retire(self.message)
 def multi_bind_message(message:Message,*player_inputs:Player_Input_In_Response_To_Message):
     """
     binds a single message to multiple inputs correctly
@@ -392,6 +700,55 @@ def multi_bind_message(message:Message,*player_inputs:Player_Input_In_Response_T
         _message = player_input.bind_message(_message)
     for player_input in player_inputs:
         player_input.message = _message
+class Input_Panel(object):
+    """
+    a single message showing the status of every input attached to it, edited as a unit;
+    attached inputs show their status only through the panel, so a round costs one edit per change rather than one per input
+
+    the panel is first sent once every attached input's own message has been, so that it follows them in the channel
+    """
+    def __init__(
+            self,sender:Sender,players_who_can_see:Optional[PlayersIds] = None,channel_id:Optional[ChannelId] = None,
+            basic:bool = False):
+        self.sender = sender
+        self.inputs:list[Player_Input[Any]] = []
+        self.basic = basic
+        self.message:Message = Alias_Message(
+            Message(players_who_can_see=players_who_can_see,channel_id=channel_id),
+            content_modifier=lambda content: self.text())
+        self._sent_versions:Optional[tuple[int,...]] = None
+    def attach(self,*inputs:Player_Input[Any]):
+        """has inputs show their status on this panel rather than on their own"""
+        for input in inputs:
+            if input.panel is not None and input.panel is not self:
+                input.panel.detach(input)
+            #inputs compare equal to each other as GS, so membership is checked by identity
+            if not any(attached is input for attached in self.inputs):
+                self.inputs.append(input)
+            input.set_panel(self)
+        self._sent_versions = None
+    def detach(self,*inputs:Player_Input[Any]):
+        """has inputs show their own status again"""
+        for input in inputs:
+            self.inputs = list(attached for attached in self.inputs if attached is not input)
+            if input.panel is self:
+                input.set_panel(None)
+        self._sent_versions = None
+    def text(self) -> str:
+        """returns the panel's content, the status of each attached input on its own line"""
+        if not self.inputs:
+            return "*No inputs are running.*"
+        return "\n".join(input.response_status(self.basic) for input in self.inputs)
+    async def update(self):
+        """sends or edits the panel, if any attached input's status has changed since it was last sent"""
+        if not all(input.is_shown() for input in self.inputs):
+            return
+        versions = tuple(input.status_version() for input in self.inputs)
+        if versions == self._sent_versions:
+            return
+        self._sent_versions = versions
+        self.message.touch()
+        await self.sender.post(self.message)
 async def run_inputs(
         inputs:Sequence[Player_Input[Any]],
         completion_sets:Optional[list[set[Player_Input[Any]]]] = None,
@@ -400,7 +757,9 @@ async def run_inputs(
         codependent:bool = False, 
         basic_feedback:bool = False, 
         id:Optional[IDType] = None, 
-        sync_call:Callable[[IDType,bool],bool]|None = None):
+        sync_call:Callable[[IDType,bool],bool]|None = None,
+        sync_condition:Optional[asyncio.Condition] = None,
+        panel:bool = False):
     """
     runs inputs simultaniously until completion criteria are met
 
@@ -415,6 +774,16 @@ async def run_inputs(
     codependant: sets where a change in one input should update all the other inputs
 
     basic_feedback: sets whether the feedback, if it exists, should be limited to only whether an input is complete or not; True for limited, False for unlimited
+
+    id: the IDType passed to sync_call
+
+    sync_call: if given, is passed whether the completion sets are met and returns whether to treat them as met
+
+    sync_condition: completion is re-evaluated whenever this condition is notified, which happens on every update to inputs;
+    run_inputs calls whose sync_calls depend on each other should share one, so that an update to any of them re-evaluates all of them
+
+    panel: if True, inputs shown in the same channel to the same players share one Input_Panel for their statuses, sent with sender or else their own;
+    the panels stand in for both each input's own status and the feedback message
     """
     run_input_id:IDType
     if id is None:
@@ -426,20 +795,53 @@ async def run_inputs(
         completion_sets = [set(inputs)]
     logger.info(f"RUN_INPUTS({run_input_id}): waiting on completion_sets = {completion_sets}")
     def check_is_completion() -> bool:
-        completed_inputs = set(input for input in inputs if input.has_recieved_all_responses())
+        completed_inputs = set(input for input in inputs if input.is_complete())
         completed:bool = any(completed_inputs == sub_set for sub_set in completion_sets)
         if sync_call is not None:
             completed = sync_call(run_input_id,completed)
         logger.debug(f"RUN_INPUTS({run_input_id}): completed = {completed} with completed_inputs = {completed_inputs}")
         return completed
+    condition:asyncio.Condition = asyncio.Condition() if sync_condition is None else sync_condition
+    async def notify_completion_check():
+        async with condition:
+            condition.notify_all()
     async def wait_until_completion():
-        while not check_is_completion():
-            await asyncio.sleep(SLEEP_TIME)
-    if sender is not None:
+        async with condition:
+            await condition.wait_for(check_is_completion)
+    on_updates:list[tuple[Player_Input[Any],OnUpdate]] = []
+    if codependent:
+        logger.info(f"RUN_INPUTS({run_input_id}): setting up codependencies")
+        def make_codependent_update(input:Player_Input[Any]) -> OnUpdate:
+            async def codependent_update():
+                #the other input's validator may depend on this one's responses
+                version = input.status_version()
+                await input.revalidate()
+                if input.status_version() != version:
+                    await input.update_response_status()
+            return codependent_update
+        for input1 in inputs:
+            for input2 in inputs:
+                if input1 != input2:
+                    on_updates.append((input1,input1.on_update(make_codependent_update(input2))))
+    panels:list[Input_Panel] = []
+    if panel:
+        logger.info(f"RUN_INPUTS({run_input_id}): setting up panels")
+        grouped:dict[tuple[Optional[ChannelId],Optional[frozenset[PlayerId]]],list[Player_Input[Any]]] = {}
+        for input in inputs:
+            grouped.setdefault(input.panel_key(),[]).append(input)
+        for (channel_id,players_who_can_see),group in grouped.items():
+            input_panel = Input_Panel(
+                group[0].sender if sender is None else sender,
+                None if players_who_can_see is None else list(players_who_can_see),
+                channel_id,
+                basic_feedback)
+            input_panel.attach(*group)
+            panels.append(input_panel)
+    elif sender is not None:
         logger.info(f"RUN_INPUTS({run_input_id}): setting up feedback")
         def feedback_text() -> str:
             feedback_list = []
-            for input in (input for input in inputs if not input.has_recieved_all_responses()):
+            for input in (input for input in inputs if not input.is_complete()):
                 feedback_list.append("Monitoring: " + input.response_status(basic_feedback))
             if len(feedback_list) == 0:
                 return "*All inputs are satisfied.*"
@@ -448,18 +850,20 @@ async def run_inputs(
         feedback_message:Message = Alias_Message(
             Message(players_who_can_see=who_can_see),content_modifier=lambda content:feedback_text())
         await sender(feedback_message)
+        sent_versions:list[tuple[int,...]] = [tuple(input.status_version() for input in inputs)]
         async def on_update():
-            await sender(feedback_message)
+            versions = tuple(input.status_version() for input in inputs)
+            if versions == sent_versions[0]:
+                return
+            sent_versions[0] = versions
+            feedback_message.touch()
+            await sender.post(feedback_message)
         for input in inputs:
-            input.on_update(on_update)
+            on_updates.append((input,input.on_update(on_update)))
     else:
         logger.info(f"RUN_INPUTS({run_input_id}): supressing feedback")
-    if codependent:
-        logger.info(f"RUN_INPUTS({run_input_id}): setting up codependencies")
-        for input1 in inputs:
-            for input2 in inputs:
-                if input1 != input2:
-                    input1.on_update(input2.update_response_status)#didn't work!!!!!!!
+    for input in inputs:
+        on_updates.append((input,input.on_update(notify_completion_check)))
     logger.info(f"RUN_INPUTS({run_input_id}): creating the wait task")
     wait_task = asyncio.create_task(wait_until_completion())
     logger.info(f"RUN_INPUTS({run_input_id}): creating the input tasks")
@@ -472,11 +876,16 @@ async def run_inputs(
     logger.info(f"RUN_INPUTS({run_input_id}): waiting for all tasks to be done")
     await asyncio.wait(all_tasks)
     logger.info(f"all criteria are met with inputs = {inputs}")
-    await asyncio.sleep(5)#give tasks some time to finish
-    for task in all_tasks:
-        if not task.done():
-            task.cancel()
+    for task in _runs:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"RUN_INPUTS({run_input_id}): input task failed with {task.exception()!r}")
+    for input,func in on_updates:
+        input.remove_on_update(func)
     #make sure feedback is correct when we exit
-    if sender is not None:
+    for input_panel in panels:
+        await input_panel.update()
+        input_panel.detach(*inputs)
+    if sender is not None and not panel:
+        feedback_message.touch()
         await sender(feedback_message)
     logger.info(f"RUN_INPUTS({run_input_id}): waiting is over")
@@ -1,4 +1,7 @@
-from typing import Any, Callable, Optional, Literal
+import asyncio
+import inspect
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Iterable, Optional, Literal
 
 from profanity_check import predict_prob
 
@@ -15,33 +18,108 @@ the bool determines whether a given response was valid, true for allowed, false
 the str|None determines the feedback given; None results in no feedback, otherwise the str is returned as feedback to the player
 """
 type ResponseValidator[DataType] = Callable[[PlayerId,DataType|None],Validation]
+type AsyncResponseValidator[DataType] = Callable[[PlayerId,DataType|None],Awaitable[Validation]]
+"""a response validator which must be awaited, for validation that would otherwise block the event loop"""
+type AnyResponseValidator[DataType] = ResponseValidator[DataType]|AsyncResponseValidator[DataType]
+type ValidatorCost = Literal['cheap','expensive']
+"""
+how costly a validator is to call
+
+'cheap' validators are called directly whenever a validation is needed
+
+'expensive' validators are run in an executor, with all the validations needed by an update run together
+"""
+
+def expensive[V:Callable](validator:V) -> V:
+    """marks a sync validator as expensive, so that inputs run it in an executor rather than on the event loop"""
+    validator.cost = 'expensive'#type: ignore
+    return validator
+
+def validator_cost(validator:Callable) -> ValidatorCost:
+    """returns the cost class the validator declared, defaulting to 'cheap'"""
+    return getattr(validator,'cost','cheap')
+
+def is_async_validator(validator:Callable) -> bool:
+    """returns whether the validator must be awaited"""
+    return inspect.iscoroutinefunction(validator) or inspect.iscoroutinefunction(getattr(validator,'__call__',None))
+
+def offload[DataType](
+        validator:ResponseValidator[DataType],
+        executor:Optional[Executor] = None) -> AsyncResponseValidator[DataType]:
+    """
+    wraps a sync validator into an async one which runs it in an executor
+
+    executor: the executor to run in, if None the event loop's default thread pool; a process pool needs a picklable validator
+    """
+    async def offloaded(player:PlayerId,data:DataType|None) -> Validation:
+        return await asyncio.get_running_loop().run_in_executor(executor,validator,player,data)
+    return offloaded
 
 def not_none(player:PlayerId,data:Any) -> Validation:
     return data is not None , None
 
-def make_set_validator[T](
-        individual_validator:ResponseValidator[T],
-        mode:Literal['any','all','always','never'] = 'all') -> ResponseValidator[set[T]]:
-    def validator(player:PlayerId,value:Optional[set[T]]) -> Validation:
+class Set_Validator[T]:
+    """
+    a response validator for sets, validating each element with an individual validator;
+    each element's validation is remembered per player, so a change to a set only validates the elements that were added,
+    and the set's validity and feedback are kept up to date from the elements that changed
+
+    mode: 'any' if one valid element is enough, 'all' if every element must be valid, and 'always' or 'never' to ignore the elements' validity
+    """
+    def __init__(
+            self,individual_validator:ResponseValidator[T],
+            mode:Literal['any','all','always','never'] = 'all'):
+        self.individual_validator = individual_validator
+        self.mode:Literal['any','all','always','never'] = mode
+        self.cost:ValidatorCost = validator_cost(individual_validator)
+        self._validations:PlayerDict[dict[T,Validation]] = {}
+        self._num_valid:PlayerDict[int] = {}
+        self._feedback:PlayerDict[str|None] = {}
+        "each player's joined feedback, or None if it must be joined again"
+    def invalidate(self,players:Optional[Iterable[PlayerId]] = None):
+        """forgets remembered element validations, for when something the individual validator depends on changes"""
+        for player in (list(self._validations) if players is None else players):
+            self._validations.pop(player,None)
+            self._num_valid.pop(player,None)
+            self._feedback.pop(player,None)
+    def __call__(self,player:PlayerId,value:Optional[set[T]]) -> Validation:
         if value is None:
             return (False,None)
+        validations = self._validations.setdefault(player,{})
+        num_valid = self._num_valid.get(player,0)
+        feedback_changed:bool = player not in self._feedback
+        for removed in list(element for element in validations if element not in value):
+            element_valid,element_feedback = validations.pop(removed)
+            num_valid -= element_valid
+            feedback_changed = feedback_changed or element_feedback is not None
+        for added in list(element for element in value if element not in validations):
+            element_valid,element_feedback = self.individual_validator(player,added)
+            validations[added] = (element_valid,element_feedback)
+            num_valid += element_valid
+            feedback_changed = feedback_changed or element_feedback is not None
+        self._num_valid[player] = num_valid
+        if feedback_changed:
+            self._feedback[player] = '\n'.join(feedback for _,feedback in validations.values() if feedback is not None)
+        feedback = self._feedback[player]
         valid:bool = True
-        feedback:str = ""
-        validations = list(individual_validator(player,v) for v in value)
-        feedback = '\n'.join(feedback for _,feedback in validations if feedback is not None)
-        match(mode):
+        match(self.mode):
             case 'any':
-                valid = any(valid for valid,_ in validations)
+                valid = num_valid > 0
             case 'all':
-                valid = all(valid for valid,_ in validations)
+                valid = num_valid == len(validations)
             case 'always':
                 valid = True
             case 'never':
                 valid = False
-        if feedback == "":
+        if not feedback:
             return (valid,None)
         return (valid,feedback)
-    return validator
+
+def make_set_validator[T](
+        individual_validator:ResponseValidator[T],
+        mode:Literal['any','all','always','never'] = 'all') -> Set_Validator[T]:
+    """creates a Set_Validator validating each element with individual_validator"""
+    return Set_Validator(individual_validator,mode)
 
 def text_validator_maker(
         is_substr_of:Optional[str] = None,
@@ -62,6 +140,7 @@ def text_validator_maker(
         
 ) -> ResponseValidator[str]:
     """creates a response validator for str's matching given validation, and with feedback given on problems with the input"""
+    @expensive#the profanity filter runs a model on every call
     def validator(player:PlayerId,value:Optional[str]) -> Validation:
         if value is None:
             return (False,None)
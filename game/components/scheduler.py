@@ -0,0 +1,106 @@
+import asyncio
+import heapq
+import inspect
+from typing import Any, Awaitable, Callable, Optional
+
+from game import get_logger
+
+logger = get_logger(__name__)
+
+type TimerCallback = Callable[[],Optional[Awaitable[Any]]]
+
+class Timer(object):
+    """
+    a callback scheduled by a Scheduler to be called at a time on the event loop's clock
+
+    active: whether the timer is still waiting to be called; False once it has been called or cancelled
+    """
+    __slots__ = ('when','callback','active')
+    def __init__(self,when:float,callback:TimerCallback):
+        self.when = when
+        self.callback = callback
+        self.active:bool = True
+
+class Scheduler(object):
+    """
+    a single heap of timers served by one sleeping task, so that many pending deadlines do not each need their own task;
+    scheduling, cancelling and rescheduling are O(log n), with cancelled timers dropped when they reach the top of the heap
+    """
+    def __init__(self):
+        self._heap:list[tuple[float,int,Timer]] = []
+        self._counter:int = 0
+        self._pending:int = 0
+        self._task:Optional[asyncio.Task[None]] = None
+        self._wakeup:Optional[asyncio.Event] = None
+        self._running:set[asyncio.Task[Any]] = set()
+        "tasks started for async callbacks, kept so they are not garbage collected mid run"
+    def __len__(self) -> int:
+        return self._pending
+    def schedule(self,delay:float,callback:TimerCallback) -> Timer:
+        """
+        calls callback after delay seconds, returning the Timer with which it can be cancelled;
+        if callback returns an awaitable, it is run as its own task so as not to hold up other timers
+        """
+        loop = asyncio.get_running_loop()
+        timer = Timer(loop.time() + delay,callback)
+        self._push(timer)
+        return timer
+    def cancel(self,timer:Timer):
+        """stops timer from being called, if it has not been already"""
+        if timer.active:
+            timer.active = False
+            self._pending -= 1
+    def reschedule(self,timer:Timer,delay:float) -> Timer:
+        """cancels timer, and returns a new Timer calling the same callback after delay seconds"""
+        self.cancel(timer)
+        return self.schedule(delay,timer.callback)
+    def clear(self):
+        """cancels all timers"""
+        for _,_,timer in self._heap:
+            timer.active = False
+        self._heap.clear()
+        self._pending = 0
+    def _push(self,timer:Timer):
+        earliest:Optional[float] = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap,(timer.when,self._counter,timer))
+        self._counter += 1
+        self._pending += 1
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._serve())
+        elif earliest is None or timer.when < earliest:
+            assert self._wakeup is not None
+            self._wakeup.set()
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        assert self._wakeup is not None
+        wakeup = self._wakeup
+        while True:
+            while self._heap and not self._heap[0][2].active:
+                heapq.heappop(self._heap)
+            wakeup.clear()
+            if not self._heap:
+                await wakeup.wait()
+                continue
+            delay = self._heap[0][0] - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(wakeup.wait(),delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _,_,timer = heapq.heappop(self._heap)
+            timer.active = False
+            self._pending -= 1
+            try:
+                result = timer.callback()
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._running.add(task)
+                    task.add_done_callback(self._finish)
+            except Exception:
+                logger.exception(f"timer callback {timer.callback} failed")
+    def _finish(self,task:asyncio.Future[Any]):
+        self._running.discard(task)#type: ignore
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"timer callback failed with {task.exception()!r}")
@@ -15,6 +15,18 @@ class Sender(object):
     async def _send(self,message:Message):
         """lowest level definition of the default Sender's sending capabilities"""
         pass
+    async def post(self,message:Message):
+        """
+        displays message like calling the sender, but, for senders able to, only waits until it is first sent, with later edits made in the background;
+        meant for messages edited often, whose senders need not wait to see each edit made
+        """
+        await self(message)
+    async def flush(self):
+        """waits until everything posted so far is displayed, for senders that do not display it at once"""
+        pass
+    async def retire(self,message:Message):
+        """called once no more responses to message are wanted, so that senders may take down whatever they displayed for responding to it"""
+        pass
     def format_players_md(self,players:Iterable[PlayerId]) -> str:
         """format a list of PlayerIds with markdown; --migtht replace with formatter object"""
         return wordify_iterable(players)
@@ -29,4 +41,12 @@ class Multiple_Sender(Sender):
     async def __call__(self, message: Message):
         for sender in self.senders:
             await sender(message)
-        return await self._send(message)
\ No newline at end of file
+        return await self._send(message)
+    @override
+    async def flush(self):
+        for sender in self.senders:
+            await sender.flush()
+    @override
+    async def retire(self,message:Message):
+        for sender in self.senders:
+            await sender.retire(message)
\ No newline at end of file
@@ -5,7 +5,7 @@ import utils.emoji_groups
 from game import kick_text, score_to_placement, get_logger
 from game.components.game_interface import Game_Interface
 from game.components.interface_component import Interface_Component
-from game.components.message import Message
+from game.components.message import Attachment, Message
 from game.components.player_input import Player_Input
 from game.components.response_validator import (
     ResponseValidator,
@@ -72,25 +72,32 @@ class Game(Interface_Component):
         """
         intended function to run the selected game
         """
-        logger.info(f"Setting up {self}.")
-        await self.game_setup()
-        logger.info(f"Playing intro of {self}.")
-        await self.game_intro()
+        self.gi.game_type = self.__class__.__name__
         try:
-            logger.info(f"Starting to run {self}.")
-            await self._run()
-            logger.info(f"Gracefully finished running {self}.")
-        except GameEndException as e:
-            logger.warning(f"{self} ended due to {e}.")
-            self.game_end_exception = e
-            await self.basic_send(e.explanation)
-        except:  # noqa: E722
-            logger.exception("Game failed due to unexpected error.")
-            await self.basic_send("The game has experienced an unforseen exception and will attempt to close itself...")
-        logger.info(f"Un-setting up {self}.")
-        await self.game_unsetup()
-        logger.info(f"Playing outro for {self}.")
-        await self.game_outro()
+            logger.info(f"Setting up {self}.")
+            await self.game_setup()
+            logger.info(f"Playing intro of {self}.")
+            await self.game_intro()
+            try:
+                logger.info(f"Starting to run {self}.")
+                await self._run()
+                logger.info(f"Gracefully finished running {self}.")
+            except GameEndException as e:
+                logger.warning(f"{self} ended due to {e}.")
+                self.game_end_exception = e
+                await self.basic_send(e.explanation)
+            except:  # noqa: E722
+                logger.exception("Game failed due to unexpected error.")
+                await self.basic_send("The game has experienced an unforseen exception and will attempt to close itself...")
+            logger.info(f"Un-setting up {self}.")
+            await self.game_unsetup()
+            logger.info(f"Playing outro for {self}.")
+            await self.game_outro()
+        finally:
+            #also reached when the game errors outside of _run or is cancelled by force_idle, so the next game starts clean
+            self.gi.game_type = None
+            await self.gi.latency_store.save()
+            await self.sender.flush()
         logger.info(f"Done running {self}.")
     def generate_placements(self) -> PlayerPlacement:
         return tuple()
@@ -235,14 +242,14 @@ class Game(Interface_Component):
         """
         return self.current_class_execution not in self.classes_banned_from_speaking
     async def basic_policed_send(
-            self,content:Optional[str] = None,attachments_data:list[str] = [],
+            self,content:Optional[str] = None,attachments_data:list[Attachment] = [],
             channel_id:Optional[ChannelId] = None):
         """
         self.basic_send if self.allowed_to_speak
         
         content: the text content of the message
         
-        attachments_data: a list of file paths to attach to the message
+        attachments_data: a list of file paths, or Attachment_Buffers, to attach to the message
         
         channel_id: what channel to send the message on
         """
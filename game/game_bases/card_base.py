@@ -1,3 +1,4 @@
+import asyncio
 import dataclasses
 import random
 from collections import Counter
@@ -10,10 +11,10 @@ import PIL.ImageOps
 import utils.emoji_groups
 from game import make_player_dict
 from game.components.game_interface import Game_Interface
-from game.components.message import Message
+from game.components.message import Attachment_Buffer, Message
 from game.game import Game, police_game_callable
 from utils.common import arg_fix_grouping
-from utils.grammar import temp_file_path, wordify_iterable
+from utils.grammar import wordify_iterable
 from utils.types import GS, ChannelId, Grouping, PlayerDict, PlayerId
 
 POKER_HAND_NAMES = ["high card","pair","two pair","three of a kind","straight","flush","full house","four of a kind","straight flush","royal flush"]
@@ -42,7 +43,7 @@ def wordify_cards(cards:Grouping['Card']) -> str:
 def frequency(values:list[int]) -> dict[int,int]:
     return dict(Counter(values))
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True,slots=True)
 class Card(GS):
     suit:int
     value:int
@@ -289,16 +290,13 @@ class Card_Base(Game):
         self.hands:PlayerDict[Hand] = {}
         for player in self.unkicked_players:
             self.hands[player] = Hand()
+        new_players = list(player for player in self.unkicked_players if player not in self.hand_threads)#if first time
+        thread_ids = await asyncio.gather(*(self.gi.new_channel("Your hand",[player]) for player in new_players))
+        self.hand_threads.update(zip(new_players,thread_ids))
         for player in self.unkicked_players:
-            if player not in self.hand_threads:#if first time
-                thread_id = await self.gi.new_channel("Your hand",[player])
-                self.hand_threads[player] = thread_id
             await self.update_hand(player)
-    def ch_to_attachment(self,ch:Card_Holder) -> str:
-        image = ch.image()
-        path = temp_file_path(".png")
-        image.save(path)
-        return path
+    def ch_to_attachment(self,ch:Card_Holder) -> Attachment_Buffer:
+        return Attachment_Buffer.from_image(ch.image(),"cards.png")
     @police_game_callable
     async def update_hand(self,player:PlayerId,add_text:str = ""):
         contents = add_text
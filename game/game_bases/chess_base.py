@@ -4,11 +4,12 @@ import chess
 
 from config.game_bases_config import game_bases_config
 from game.components.game_interface import Game_Interface
-from game.components.response_validator import ResponseValidator, Validation
+from game.components.message import Attachment_Buffer
+from game.components.response_validator import ResponseValidator, Validation, expensive
 from game.game import Game
 from utils.chess_tools import get_move, get_square_name, render_chess, RenderChessAll, RenderChessOptional, RENDERCHESSOPTIONS
 from utils.common import get_first
-from utils.grammar import temp_file_path, wordify_iterable
+from utils.grammar import wordify_iterable
 from utils.types import Grouping, PlayerId
 
 CONFIG = game_bases_config['chess_base']
@@ -76,6 +77,8 @@ def chess_move_validator_maker(
                     f"given move '{move.uci()}' is not a legal move"
                 )
         return (True,None)
+    if is_legal_on_any is not None:#checking legality generates moves on each board
+        return expensive(validator)
     return validator
 
 class Chess_Base(Game):
@@ -90,11 +93,9 @@ class Chess_Base(Game):
             for key,item in CONFIG.items():
                 if key in RENDERCHESSOPTIONS:
                     self.default_render[key] = item #type: ignore
-    def make_board_image(self,render_args:RenderChessOptional = {}) -> str:
+    def make_board_image(self,render_args:RenderChessOptional = {}) -> Attachment_Buffer:
         args:RenderChessAll = self.default_render|render_args #type:ignore
         image = render_chess(
             **args #type: ignore
         )
-        file_path = temp_file_path('.png')
-        image.save(file_path)
-        return file_path
\ No newline at end of file
+        return Attachment_Buffer.from_image(image,"board.png")
\ No newline at end of file
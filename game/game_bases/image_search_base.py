@@ -8,8 +8,8 @@ import requests
 
 from config.game_bases_config import game_bases_config
 from game.components.game_interface import Game_Interface
+from game.components.message import Attachment_Buffer
 from game.game import Game
-from utils.grammar import temp_file_path
 from utils.image_search import (
     Image_Search,
     ImageSearchException,
@@ -109,11 +109,9 @@ class Image_Search_Base(Game):
                 raise ImageSearchException(f"Unable to randomly for image image using size = {size}, search_terms = {search_terms}, num_tries = {NUM_RANDOM_SEARCH_TRIES}")
         image = image.convert('RGBA')
         return image
-    def temp_random_image(self,size:Optional[tuple[int,int]] = None,search_terms:list[str]=[]) -> str:
+    def random_image_attachment(self,size:Optional[tuple[int,int]] = None,search_terms:list[str]=[]) -> Attachment_Buffer:
         image:PIL.Image.Image = self.random_image(size,search_terms)
-        path = temp_file_path(".png")
-        image.save(path)
-        return path
+        return Attachment_Buffer.from_image(image,"image.png")
             
         
     
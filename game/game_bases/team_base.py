@@ -3,7 +3,7 @@ from typing import Optional, override
 
 from game import kick_text
 from game.components.game_interface import Game_Interface
-from game.components.message import Message
+from game.components.message import Attachment, Message
 from game.game_bases.elimination_base import Elimination_Framework
 from game.game_bases.round_base import Rounds_Base
 from game.game_bases.rounds_with_points_base import Rounds_With_Points_Framework
@@ -71,12 +71,13 @@ class Team_Base(Rounds_Base):
             self.all_teams[i]:frozenset(self.unkicked_players[i::self.num_teams])
             for i in range(self.num_teams)
         }
-        self.team_channel_id:TeamDict[ChannelId] = {
-            team:await self.gi.new_channel(
+        team_channel_ids = await asyncio.gather(*(
+            self.gi.new_channel(
                 f"{str(team)}'s Team Channel",
                 self.team_players[team]
             ) for team in self.all_teams
-        }
+        ))
+        self.team_channel_id:TeamDict[ChannelId] = dict(zip(self.all_teams,team_channel_ids))
         for team in self.all_teams:
             await self.basic_send(
                 f"On team '{team}' we have {self.sender.format_players(self.team_players[team])}!"
@@ -85,7 +86,7 @@ class Team_Base(Rounds_Base):
             self,
             teams:Grouping[Team]|Team|None,
             content:Optional[str] = None,
-            attatchements_data:list[str] = []):
+            attatchements_data:list[Attachment] = []):
         """
         creates a message with the given parameters and sends it with self.sender
 
@@ -93,7 +94,7 @@ class Team_Base(Rounds_Base):
         
         content: the text content of the message
         
-        attatchements_data: a list of file paths to attatch to the message
+        attatchements_data: a list of file paths, or Attachment_Buffers, to attatch to the message
         """
         teams = arg_fix_grouping(self.all_teams,teams)
         for team in teams:
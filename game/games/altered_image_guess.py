@@ -8,9 +8,9 @@ import PIL.ImageFilter
 from config.games_config import games_config
 from game import get_logger
 from game.components.game_interface import Game_Interface
+from game.components.message import Attachment_Buffer
 from game.game_bases import Image_Search_Base, Rounds_With_Points_Base
 from utils.common import random_from, random_in_range
-from utils.grammar import temp_file_path
 from utils.image_modification_functions import (
     black_and_white,
     blur,
@@ -194,14 +194,12 @@ class Altered_Image_Guess(Rounds_With_Points_Base,Image_Search_Base):
         alter_method = random.choice(list(ALTER_METHODS))
         altered_image = ALTER_METHODS[alter_method](image)
 
-        image_path = temp_file_path(".png")
-        altered_path = temp_file_path(".png")
-        image.save(image_path)
-        altered_image.save(altered_path)
+        image_attachment = Attachment_Buffer.from_image(image,"image.png")
+        altered_attachment = Attachment_Buffer.from_image(altered_image,"altered.png")
 
         await self.basic_send(
             f"I have found a random image from a search prompt, here is a version I have altered through {alter_method} the image.",
-            attachments_data=[altered_path]
+            attachments_data=[altered_attachment]
         )
         
         responses:PlayerDict[int] = await self.basic_multiple_choice(
@@ -215,7 +213,7 @@ class Altered_Image_Guess(Rounds_With_Points_Base,Image_Search_Base):
 
         await self.basic_send(
             f"I actually searched for '{actual_search}'.",
-            attachments_data=[image_path]
+            attachments_data=[image_attachment]
         )
 
         await self.score(correct_players,1)
@@ -8,6 +8,7 @@ import pandas
 from config.config import config
 from config.games_config import games_config
 from game.components.game_interface import Game_Interface
+from game.components.message import Attachment_Buffer
 from game.game_bases import Chess_Base, Elimination_Base
 from utils.chess_tools import get_game_over_text, get_move_text
 from utils.types import PlayerId
@@ -134,7 +135,7 @@ class Chess_Puzzle_Elimination(Elimination_Base,Chess_Base):
         player_color_name:str = chess.COLOR_NAMES[player_color]
         self.white_perspective = self.board.turn
 
-        def get_board() -> str:
+        def get_board() -> Attachment_Buffer:
             return self.make_board_image({"white_perspective" : player_color})
 
         move_index = 1
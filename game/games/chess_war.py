@@ -1,3 +1,4 @@
+import asyncio
 import json
 from typing import Callable, override, overload, Optional, Iterator
 import dataclasses
@@ -6,7 +7,7 @@ import chess
 
 from game import get_logger
 from game.components.game_interface import Game_Interface
-from game.components.message import Alias_Message, Bullet_Point, Message
+from game.components.message import Alias_Message, Attachment, Attachment_Buffer, Bullet_Point, Message
 from game.components.player_input import (
     Player_Single_Selection_Input,
     run_inputs,
@@ -40,7 +41,9 @@ class Chess_War(Team_Base,Chess_Base):
         self.team_moves:TeamDict[Move_Library]
         self.player_is_ready:PlayerDict[bool]
         self.all_ready:bool
+        self.sync_condition:asyncio.Condition = asyncio.Condition()
         self.team_board_player_messages:TeamDict[set[Message]]
+        self.team_move_inputs:TeamDict[list[Player_Multi_Text_Input]]
     @override
     async def game_intro(self):
         await self.basic_send(
@@ -76,6 +79,7 @@ class Chess_War(Team_Base,Chess_Base):
         self.team_moves = {}
         self.player_is_ready = {}
         self.team_board_player_messages = {}
+        self.team_move_inputs = {}
         self.all_ready = False
         for team in self.unkicked_teams:
             board = self.board.copy()
@@ -83,13 +87,14 @@ class Chess_War(Team_Base,Chess_Base):
             self.team_boards[team] = board
             self.team_moves[team] = Move_Library()
             self.team_board_player_messages[team] = set()
+            self.team_move_inputs[team] = []
             for player in self.team_players[team]:
                 self.player_is_ready[player] = False
             await self.show_team_board(team)
     @override
     async def core_player(self, team: Team, player: PlayerId):
         await super().core_player(team, player)
-        def attach_modifier(_:list[str]|None) -> list[str]|None:
+        def attach_modifier(_:list[Attachment]|None) -> list[Attachment]|None:
             player_squares:set[chess.Square] = self.player_owned_squares[player].copy()
             for move in self.team_moves[team]:
                 if move.from_square in player_squares:
@@ -113,6 +118,27 @@ class Chess_War(Team_Base,Chess_Base):
             attach_paths_modifier=attach_modifier)
         self.team_board_player_messages[team].add(your_pieces_message)
         await self.sender(your_pieces_message)
+        static_checks:dict[str,tuple[chess.Move|None,str|None]] = {}
+        "each submitted text's move and the feedback from the checks that can't change during the round, so they are only made once per text"
+        def static_check(text:str) -> tuple[chess.Move|None,str|None]:
+            if text in static_checks:
+                return static_checks[text]
+            move = get_move(text)
+            problem:str|None = None
+            if move is None:
+                problem = f"'{text}' could not be interpreted"
+            elif move.from_square not in self.player_owned_squares[player]:
+                problem = f"starting square '{chess.SQUARE_NAMES[move.from_square]}' is not owned by you"
+            else:
+                self.board.turn = self.get_color(team)#set turn for is_legal check
+                if not self.board.is_pseudo_legal(move):#is legal letting King get in check
+                    problem = f"'{text}:{get_move_text(self.board,move)}' is not pseudo-legal in this position."
+                elif self.board.is_castling(move):
+                    problem = f"'{text}:{get_move_text(self.board,move)}' is not allowed because castling is not permitted in this game."
+                elif self.board.is_en_passant(move):
+                    problem = f"'{text}:{get_move_text(self.board,move)}' is not allowed because en passant is not permitted in this game."
+            static_checks[text] = (move,problem)
+            return move,problem
         @overload
         def validator(_,values:set[str]|None, return_legal_moves:None = ...) -> tuple[bool,str|None]:
             ...
@@ -122,25 +148,15 @@ class Chess_War(Team_Base,Chess_Base):
         def validator(_,values:set[str]|None, return_legal_moves:Optional[bool] = None) -> tuple[bool,str|None]|set[chess.Move]:
             if values is None:#not yet initialized
                 return (True,None)
-            moves = {text:get_move(text) for text in values}
+            moves:dict[str,chess.Move|None] = {}
             feedback:dict[str,str] = {}
-            for text,move in moves.items():
-                if move is None:
-                    feedback[text] = f"'{text}' could not be interpreted"
-                    continue
-                if move.from_square not in self.player_owned_squares[player]:
-                    feedback[text] = f"starting square '{chess.SQUARE_NAMES[move.from_square]}' is not owned by you"
-                    continue
-                self.board.turn = self.get_color(team)#set turn for is_legal check
-                if not self.board.is_pseudo_legal(move):#is legal letting King get in check
-                    feedback[text] = f"'{text}:{get_move_text(self.board,move)}' is not pseudo-legal in this position."
-                    continue
-                if self.board.is_castling(move):
-                    feedback[text] = f"'{text}:{get_move_text(self.board,move)}' is not allowed because castling is not permitted in this game."
-                    continue
-                if self.board.is_en_passant(move):
-                    feedback[text] = f"'{text}:{get_move_text(self.board,move)}' is not allowed because en passant is not permitted in this game."
+            for text in values:
+                move,problem = static_check(text)
+                moves[text] = move
+                if problem is not None:
+                    feedback[text] = problem
                     continue
+                assert move is not None
                 if move.to_square in self.team_moves[team].to_squares():#make sure your team isn't already moving there
                     if move in self.team_moves[team]:
                         continue
@@ -170,6 +186,7 @@ class Chess_War(Team_Base,Chess_Base):
                 players_who_can_see=[player]
             )
         )
+        self.team_move_inputs[team].append(move_input)
         @move_input.on_update
         async def on_update():
             response = move_input.responses[player]
@@ -188,6 +205,9 @@ class Chess_War(Team_Base,Chess_Base):
             for move in do_moves:
                 self.set_team_board(team,move)
                 self.team_moves[team].add(move)
+            for teammate_input in self.team_move_inputs[team]:
+                if teammate_input is not move_input:#their moves may now conflict with ours
+                    teammate_input.invalidate_validations()
             await self.show_team_board(team)
             #await self.sender(your_pieces_message)
         are_done = Player_Single_Selection_Input(
@@ -212,7 +232,9 @@ class Chess_War(Team_Base,Chess_Base):
             sender = self.sender,
             basic_feedback=True,
             id=player,
-            sync_call=self.sync_call
+            sync_call=self.sync_call,
+            sync_condition=self.sync_condition,
+            panel=True
         )
     @override
     async def end_round(self):
@@ -317,18 +339,21 @@ class Chess_War(Team_Base,Chess_Base):
         self.team_boards[team].set_piece_at(move.from_square,None)
         self.team_boards[team].set_piece_at(move.to_square,piece)
     async def show_team_board(self,team:Team):
+        #the boards are drawn from the team's moves, which the messages can't see change
+        self.team_board_messages[team].touch()
         await self.sender(self.team_board_messages[team])
         for message in self.team_board_player_messages[team]:
+            message.touch()
             await self.sender(message)
-    def make_team_board(self,team:Team,extra_args:RenderChessOptional = {}) -> str:
+    def make_team_board(self,team:Team,extra_args:RenderChessOptional = {}) -> Attachment_Buffer:
         board = self.team_boards[team]
         args:RenderChessOptional = {#type: ignore
             'board' : board,
             'white_perspective' : self.get_color(team)
         }|extra_args
         return self.make_board_image(args)
-    def make_team_board_callable(self,team:Team,extra_args:RenderChessOptional = {}) -> Callable[[list[str]|None],list[str]|None]:
-        def wrapper(_:list[str]|None) -> list[str]|None:
+    def make_team_board_callable(self,team:Team,extra_args:RenderChessOptional = {}) -> Callable[[list[Attachment]|None],list[Attachment]|None]:
+        def wrapper(_:list[Attachment]|None) -> list[Attachment]|None:
             return [self.make_team_board(team,extra_args)]
         return wrapper
     def sync_call(self,id:PlayerId,completed:bool) -> bool:
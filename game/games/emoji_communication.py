@@ -5,6 +5,7 @@ import emoji
 
 from config.games_config import games_config
 from game.components.game_interface import Game_Interface
+from game.components.response_validator import expensive
 from game.game_bases import (
     Basic_Secret_Message_Base,
     Game_Word_Base,
@@ -52,6 +53,7 @@ def is_only_emoji(text:str) -> bool:
         for token in emoji.analyze("".join(text.split()),True,True)
         )
 
+@expensive
 def emoji_response_validator(player:PlayerId,value:str|None) -> tuple[bool,str|None]:
     if value is None:
         return (False,None)
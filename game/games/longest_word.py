@@ -4,7 +4,7 @@ from config.games_config import games_config
 from game.components.game_interface import Game_Interface
 from game.components.message import Alias_Message, Message
 from game.components.player_input import Player_Text_Input, run_inputs
-from game.components.response_validator import text_validator_maker
+from game.components.response_validator import expensive, text_validator_maker
 from game.game_bases import Game_Word_Base, Rounds_With_Points_Base
 from utils.types import PlayerId
 
@@ -47,7 +47,7 @@ class Longest_Word(Game_Word_Base,Rounds_With_Points_Base):
             self.gi,
             self.sender,
             [player],
-            lambda x,y: text_validator_maker(is_stricly_composed_of=self.current_letters,max_length=num_letters_can_refresh,check_lower_case=True)(x,y),
+            expensive(lambda x,y: text_validator_maker(is_stricly_composed_of=self.current_letters,max_length=num_letters_can_refresh,check_lower_case=True)(x,y)),
             message=change_letter_message
         )
         choose_word_input = Player_Text_Input(
@@ -55,7 +55,7 @@ class Longest_Word(Game_Word_Base,Rounds_With_Points_Base):
             self.gi,
             self.sender,
             [player],
-            lambda x,y: text_validator_maker(is_stricly_composed_of=self.current_letters,check_lower_case=True)(x,y),
+            expensive(lambda x,y: text_validator_maker(is_stricly_composed_of=self.current_letters,check_lower_case=True)(x,y)),
             message=choose_word_message
         )
         chosen_word:None|str = None
@@ -84,6 +84,8 @@ class Longest_Word(Game_Word_Base,Rounds_With_Points_Base):
                     list_letters += self.random_balanced_letters(NUM_LETTERS-len(list_letters))
                     self.current_letters = "".join(list_letters)
                     num_letters_can_refresh -= len(change_letters)
+                    change_letter_message.touch()
+                    choose_word_message.touch()
         return chosen_word
     @override
     async def core_game(self):
@@ -1,7 +1,7 @@
 from typing import override
 
 from game.components.game_interface import Game_Interface
-from game.components.message import Message
+from game.components.message import Attachment, Message
 from game.components.player_input import Player_Text_Input, run_inputs
 from game.components.response_validator import text_validator_maker
 from game.game_bases import Image_Search_Base, Rounds_With_Points_Base
@@ -24,14 +24,14 @@ class Picture_Telephone(Rounds_With_Points_Base, Image_Search_Base):
         Image_Search_Base.__init__(self,gi)
         self.num_rounds = NUM_ROUNDS
         self._texts:list[PlayerDict[str]]
-        self._images:list[PlayerDict[str]]
+        self._images:list[PlayerDict[Attachment]]
         self.failed_paths:set[int]
         self.current_offset = 0
     @property
     def texts(self) -> list[PlayerDict[str]]:
         return list(self._texts[i] for i in range(len(self._texts)) if i not in self.failed_paths)
     @property
-    def images(self) -> list[PlayerDict[str]]:
+    def images(self) -> list[PlayerDict[Attachment]]:
         return list(self._texts[i] for i in range(len(self._images)) if i not in self.failed_paths)
     def reset(self):
         self._texts = []
@@ -57,7 +57,7 @@ class Picture_Telephone(Rounds_With_Points_Base, Image_Search_Base):
         inputs:PlayerDict[Player_Text_Input] = {}
         for player in self.unkicked_players:
             content:str =""
-            attach_paths:list[str]|None = None
+            attach_paths:list[Attachment]|None = None
             if len(self.images[0]) == 0:
                 content = f"Please enter between {MIN_NUM_WORDS} and {MAX_NUM_WORDS} words."
             else:
@@ -88,6 +88,6 @@ class Picture_Telephone(Rounds_With_Points_Base, Image_Search_Base):
         for player in self.unkicked_players:
             i = self.i(player)
             self.texts[i][player] = text_responses[player]
-            self.images[i][player] = self.temp_random_image(search_terms=text_responses[player].split())
+            self.images[i][player] = self.random_image_attachment(search_terms=text_responses[player].split())
 
 
@@ -117,7 +117,7 @@ class The_Great_Kitten_Race(Game):
         all_inputs = list(stat_input_dict[stat] for stat in self.kitten_config['stats']) + [name_input]
         
         await run_inputs(
-            all_inputs,codependent=True
+            all_inputs,codependent=True,panel=True
         )
         
         await self.kick_none_response(*all_inputs)
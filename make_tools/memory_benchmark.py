@@ -0,0 +1,71 @@
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from game.components.game_interface import Game_Interface
+from game.components.interaction import Interaction
+from game.components.message import Alias_Message, Bullet_Point, Message, make_no_yes_bullet_points
+from game.components.player_input import Player_Multiple_Selection_Input, Player_Text_Input
+from game.game_bases.card_base import Card
+from utils.types import PlayerId
+
+NUM_OBJECTS:int = 10000
+PLAYERS:list[PlayerId] = list(range(8))#type: ignore
+
+def make_messages(gi:Game_Interface) -> list[Any]:
+    to_return:list[Any] = []
+    for i in range(NUM_OBJECTS):
+        message = Message(f"message {i}",bullet_points=make_no_yes_bullet_points())
+        to_return.append(Alias_Message(message,lambda content: f"{content}!"))
+    return to_return
+def make_bullet_points(gi:Game_Interface) -> list[Any]:
+    return list(Bullet_Point(str(i),'✅') for i in range(NUM_OBJECTS))
+def make_interactions(gi:Game_Interface) -> list[Any]:
+    return list(
+        Interaction('send_message',PLAYERS[i%len(PLAYERS)],i,0,i,f"interaction {i}")#type: ignore
+        for i in range(NUM_OBJECTS))
+def make_cards(gi:Game_Interface) -> list[Any]:
+    return list(Card(i%4,i%13) for i in range(NUM_OBJECTS))
+def make_player_inputs(gi:Game_Interface) -> list[Any]:
+    to_return:list[Any] = []
+    for i in range(NUM_OBJECTS//10):
+        to_return.append(Player_Text_Input(f"text {i}",gi,gi.default_sender,PLAYERS))
+        to_return.append(Player_Multiple_Selection_Input(
+            f"selection {i}",gi,gi.default_sender,PLAYERS,
+            message=Message(f"selection {i}",bullet_points=make_no_yes_bullet_points())))
+    return to_return
+def hash_player_inputs(gi:Game_Interface) -> list[Any]:
+    inputs = make_player_inputs(gi)
+    for _ in range(100):
+        set(inputs)
+    return inputs
+
+BENCHMARKS:dict[str,Callable[[Game_Interface],list[Any]]] = {
+    'messages' : make_messages,
+    'bullet points' : make_bullet_points,
+    'interactions' : make_interactions,
+    'cards' : make_cards,
+    'player inputs' : make_player_inputs,
+    'player input hashing' : hash_player_inputs
+}
+
+def main():
+    gi = Game_Interface()
+    print(f"{'benchmark':<24}{'kept KiB':>12}{'peak KiB':>12}{'gc objects':>12}{'ms':>10}")
+    for name,benchmark in BENCHMARKS.items():
+        gc.collect()
+        tracked_before = len(gc.get_objects())
+        tracemalloc.start()
+        start = time.perf_counter()
+        kept = benchmark(gi)
+        duration = time.perf_counter() - start
+        current,peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tracked = len(gc.get_objects()) - tracked_before
+        print(f"{name:<24}{current/1024:>12.1f}{peak/1024:>12.1f}{tracked:>12}{duration*1000:>10.1f}")
+        del kept
+        gi.purge_tracked_messages()
+
+if __name__ == '__main__':
+    main()
@@ -17,7 +17,7 @@ from typing_extensions import TypeVar
 @dataclass(frozen=True)
 class GS():
     "Base class for grouping safe objects that aren't explicit."
-    ...
+    __slots__ = ()
 
 PlayerId = NewType('PlayerId',GS)#type: ignore
 MessageId = NewType('MessageId',GS)#type: ignore